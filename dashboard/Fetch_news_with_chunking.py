@@ -1,95 +1,56 @@
-import time
+import argparse
+import os
+import sys
 from datetime import datetime
 import pandas as pd
-from bs4 import BeautifulSoup
-from selenium import webdriver
-from textblob import TextBlob
 import matplotlib.pyplot as plt
 import seaborn as sns
 
+# Share the fetch backends and page cache with the Django dashboard
+DASHBOARD_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'news_dashboard')
+sys.path.insert(0, DASHBOARD_DIR)
+from analytics.archive import append_articles
+from analytics.crawler import Crawler, DomainLimiter, RobotsCache
+from analytics.dedup import SimHashIndex, simhash
+from analytics.extraction import ProfileRegistry
+from analytics.fetchers import make_fetcher, get_soup
+from analytics.http_cache import ResponseCache
+from analytics.sentiment import score_texts
+
 # Setup
 sns.set_theme(style="whitegrid")
 
-def get_driver():
-    options = webdriver.ChromeOptions()
-    # options.add_argument('--headless') # Keep it visible for now or uncomment for headless
-    driver = webdriver.Chrome(options=options)
-    return driver
-
-def get_soup(driver, url):
-    try:
-        driver.get(url)
-        time.sleep(3)
-        return BeautifulSoup(driver.page_source, 'html.parser')
-    except Exception as e:
-        print(f"Error fetching {url}: {e}")
-        return None
-
-def chunk_text(text, chunk_size=500, overlap=50):
-    """
-    Splits text into chunks of `chunk_size` characters with `overlap`.
-    """
-    if not text:
-        return []
-    chunks = []
-    start = 0
-    text_len = len(text)
-    
-    while start < text_len:
-        end = min(start + chunk_size, text_len)
-        chunks.append(text[start:end])
-        if end == text_len:
-            break
-        start += (chunk_size - overlap)
-    return chunks
-
-def analyze_sentiment_with_chunks(text):
-    """
-    Analyzes sentiment by averaging the polarity of text chunks.
-    """
-    if not text:
-        return 0.0, 'Neutral'
-    
-    chunks = chunk_text(text)
-    if not chunks:
-        return 0.0, 'Neutral'
-        
-    chunk_polarities = []
-    for chunk in chunks:
-        blob = TextBlob(chunk)
-        chunk_polarities.append(blob.sentiment.polarity)
-    
-    # Average polarity
-    avg_polarity = sum(chunk_polarities) / len(chunk_polarities)
-    
-    if avg_polarity > 0.05:
-        return avg_polarity, 'Positive'
-    elif avg_polarity < -0.05:
-        return avg_polarity, 'Negative'
-    else:
-        return avg_polarity, 'Neutral'
-
-def main():
-    # Scrape Homepage for Links
-    url = "https://www.thehindu.com/"
-    driver = get_driver()
-    print("Fetching homepage...")
-    soup = get_soup(driver, url)
-
-    links = []
-    seen_urls = set()
-
-    if soup:
-        # Gather more links
-        for tag in soup.select('h3.title a, h2.title a, div.story-card a'):
-            href = tag.get('href')
-            if href and href not in seen_urls and 'thehindu.com' in href and '/article' in href:
-                links.append(href)
-                seen_urls.add(href)
-
-    # Fetch top 5 articles for testing (limit to save time)
-    links = links[:15]
+DEFAULT_SEEDS = ["https://www.thehindu.com/"]
+# Fingerprints of the stories seen in earlier runs, by URL
+DEDUP_INDEX_PATH = os.path.join(DASHBOARD_DIR, 'cache', 'dedup_index.json')
+# Parquet dataset the articles of every run are appended to, partitioned by crawl date
+ARCHIVE_DIR = 'news_archive'
+
+def main(seeds=None, archive_dir=ARCHIVE_DIR, csv_path=None):
+    # Crawl the seed sites for article links
+    seeds = seeds or DEFAULT_SEEDS
+    profiles = ProfileRegistry.from_file()
+    cache = ResponseCache(os.path.join(DASHBOARD_DIR, 'cache', 'http'))
+    dedup_index = SimHashIndex.load(DEDUP_INDEX_PATH)
+    robots = RobotsCache()
+    limiter = DomainLimiter(delay=0.5, connections=2, robots=robots)
+
+    def new_fetcher():
+        return make_fetcher('http', cache=cache, limiter=limiter)
+
+    print(f"Crawling {len(seeds)} seed(s)...")
+    crawler = Crawler(
+        new_fetcher,
+        robots=robots,
+        # Fetch 15 articles per site for testing (limit to save time)
+        max_articles_per_site=15,
+        ready_selectors=profiles.index_ready(),
+        article_patterns=profiles.article_patterns(),
+        article_pattern=profiles.default.article_pattern,
+    )
+    links = crawler.crawl(seeds)
     print(f"Found {len(links)} articles to process.")
+    fetcher = new_fetcher()
 
     # Scrape Individual Articles
     articles_data = []
@@ -97,78 +58,62 @@ def main():
     for link in links:
         print(f"Scraping: {link}")
         try:
-            art_soup = get_soup(driver, link)
+            profile = profiles.for_url(link)
+            art_soup = get_soup(fetcher, link, required=profile.ready, keep=profile.keep)
             if not art_soup: continue
-            
-            # Headline
-            title_tag = art_soup.select_one('h1.title')
-            title = title_tag.get_text(strip=True) if title_tag else "N/A"
-            
-            # Category
-            parts = link.split('/')
-            category = "General"
-            if 'news' in parts:
-                 try:
-                     idx = parts.index('news')
-                     if idx + 1 < len(parts):
-                         category = parts[idx+1].capitalize()
-                 except:
-                     pass
-            elif 'sport' in parts:
-                category = 'Sport'
-            elif 'business' in parts:
-                category = 'Business'
-            elif 'entertainment' in parts:
-                category = 'Entertainment'
-                
-            # Date Extraction
-            pub_date = None
-            meta_date = art_soup.find('meta', property='article:published_time')
-            if meta_date:
-                dt_str = meta_date.get('content')
-                try:
-                    pub_date = datetime.fromisoformat(dt_str).date()
-                except:
-                    pass
-            
-            if not pub_date:
-                pub_date = datetime.now().date()
-
-            # Content
-            body_div = art_soup.select_one('div[id^="content-body-"]')
-            content = body_div.get_text(strip=True) if body_div else ""
-            if not content:
-                 paras = art_soup.select('div.article-body p')
-                 content = " ".join([p.get_text(strip=True) for p in paras])
-            
-            articles_data.append({
-                'url': link,
-                'headline': title,
-                'category': category,
-                'date': pub_date,
-                'content': content
-            })
+
+            article = profile.extract(link, art_soup)
+
+            # Skip copies of a story already seen under another URL
+            fingerprint = simhash(article['content'])
+            original = dedup_index.near(fingerprint)
+            if original is not None and original != link:
+                print(f"Duplicate of {original}, skipping")
+                continue
+            dedup_index.add(link, fingerprint)
+
+            # Keep the publication date as a date
+            try:
+                article['date'] = datetime.fromisoformat(article['date']).date()
+            except ValueError:
+                article['date'] = datetime.now().date()
+
+            articles_data.append(article)
             
         except Exception as e:
             print(f"Error scraping {link}: {e}")
 
-    driver.quit()
+    print(f"Served {fetcher.cache_hits} page(s) from cache")
+    for name, stats in profiles.stats().items():
+        if stats:
+            print(f"Extraction profile {name}: {stats}")
+    fetcher.close()
+    dedup_index.save(DEDUP_INDEX_PATH)
 
     # Apply Sentiment Analysis
     df = pd.DataFrame(articles_data)
     if not df.empty:
-        df[['sentiment_score', 'sentiment_label']] = df['content'].apply(
-            lambda x: pd.Series(analyze_sentiment_with_chunks(x))
-        )
+        df['sentiment_score'], df['sentiment_label'] = score_texts(df['content'], snap='word')
 
         print("\nProcessed Data (with Chunking):")
         print(df[['headline', 'category', 'date', 'sentiment_label', 'sentiment_score']].head())
         
-        # Save to CSV for verification
-        df.to_csv('fetch_data_with_chunking.csv', index=False)
-        print("\nData saved to 'fetch_data_with_chunking.csv'")
+        # Append to the columnar archive (read it back with analytics.archive.read_articles)
+        rows = append_articles(df, archive_dir)
+        print(f"\n{rows} article(s) appended to '{archive_dir}'")
+
+        if csv_path:
+            # Save to CSV for verification
+            df.to_csv(csv_path, index=False)
+            print(f"Data saved to '{csv_path}'")
     else:
         print("No articles extracted.")
 
 if __name__ == "__main__":
-    main()
+    parser = argparse.ArgumentParser(description="Crawl news sites and archive their articles with sentiment.")
+    parser.add_argument('seeds', nargs='*', help="Seed URLs (default: The Hindu)")
+    parser.add_argument('--archive', default=ARCHIVE_DIR, help="Parquet dataset directory")
+    parser.add_argument('--csv', nargs='?', const='fetch_data_with_chunking.csv', default=None,
+                        help="Also write the run to a CSV file (for the notebooks)")
+    args = parser.parse_args()
+    main(args.seeds, archive_dir=args.archive, csv_path=args.csv)
@@ -1,3 +1,10 @@
 from django.contrib import admin
 
-# Register your models here.
+from .models import Article
+
+
+@admin.register(Article)
+class ArticleAdmin(admin.ModelAdmin):
+    list_display = ('headline', 'mapped_category', 'sentiment_label', 'published', 'checked_at')
+    list_filter = ('mapped_category', 'sentiment_label')
+    search_fields = ('headline', 'url')
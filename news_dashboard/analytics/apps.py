@@ -1,6 +1,19 @@
+import threading
+
 from django.apps import AppConfig
+from django.conf import settings
 
 
 class AnalyticsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'analytics'
+
+    def ready(self):
+        if getattr(settings, 'NEWS_NLP_WARMUP', False):
+            from .nlp import warm_up
+            # Load in the background so startup is not blocked on the model
+            threading.Thread(target=warm_up, name='nlp-warmup', daemon=True).start()
+        if getattr(settings, 'NEWS_DRIVER_WARMUP', False):
+            from .utils import get_driver_pool
+            # Start the browsers in the background, like the NLP model
+            threading.Thread(target=get_driver_pool().warm, name='driver-warmup', daemon=True).start()
@@ -0,0 +1,83 @@
+"""
+Columnar archive of crawled articles.
+
+Each run appends its articles to a Parquet dataset partitioned by crawl date
+(`crawl_date=YYYY-MM-DD/part-*.parquet`) instead of rewriting one CSV. Columns
+are typed (`date` and `crawl_date` as date32, `sentiment_score` as float64) and
+the text columns are zstd-compressed, with dictionary encoding for the
+low-cardinality ones. Readers load only the columns and crawl dates they ask
+for, memory-mapping the files.
+"""
+import uuid
+from datetime import date, datetime
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+
+SCHEMA = pa.schema([
+    ('url', pa.string()),
+    ('headline', pa.string()),
+    ('category', pa.string()),
+    ('date', pa.date32()),
+    ('content', pa.string()),
+    ('sentiment_score', pa.float64()),
+    ('sentiment_label', pa.string()),
+    ('crawl_date', pa.date32()),
+])
+PARTITIONING = ds.partitioning(pa.schema([('crawl_date', pa.date32())]), flavor='hive')
+
+
+def _to_date(value):
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    try:
+        return datetime.fromisoformat(str(value)).date()
+    except ValueError:
+        return None
+
+
+def append_articles(df, root, crawl_date=None, compression='zstd'):
+    """Appends the articles of `df` to the dataset at `root` under `crawl_date` (today by default)."""
+    frame = pd.DataFrame({
+        name: df[name] if name in df else None
+        for name in SCHEMA.names if name != 'crawl_date'
+    })
+    frame['date'] = frame['date'].map(_to_date)
+    frame['crawl_date'] = crawl_date or date.today()
+    table = pa.Table.from_pandas(frame, schema=SCHEMA, preserve_index=False)
+    ds.write_dataset(
+        table,
+        str(root),
+        format='parquet',
+        partitioning=PARTITIONING,
+        # A unique name per run so appends never overwrite earlier files
+        basename_template=f"part-{uuid.uuid4().hex}-{{i}}.parquet",
+        existing_data_behavior='overwrite_or_ignore',
+        file_options=ds.ParquetFileFormat().make_write_options(compression=compression),
+    )
+    return table.num_rows
+
+
+def read_articles(root, columns=None, since=None, until=None):
+    """
+    Loads `columns` (all by default) of the articles crawled between `since`
+    and `until` (inclusive dates) as a DataFrame, memory-mapping the files.
+    """
+    filters = []
+    if since is not None:
+        filters.append(('crawl_date', '>=', _to_date(since)))
+    if until is not None:
+        filters.append(('crawl_date', '<=', _to_date(until)))
+    table = pq.read_table(
+        str(root),
+        columns=columns,
+        filters=filters or None,
+        partitioning=PARTITIONING,
+        schema=SCHEMA,
+        memory_map=True,
+    )
+    return table.to_pandas()
@@ -0,0 +1,55 @@
+"""
+Keyword rules for article categories, each compiled into one regex and
+applied to whole DataFrame columns.
+"""
+import re
+
+import numpy as np
+import pandas as pd
+
+DEFAULT_CATEGORY = 'General'
+
+# (field, category, keywords) in priority order
+DEFAULT_RULES = (
+    ('url', 'Sports', ('sport', 'cricket', 'football')),
+    ('url', 'Business', ('business', 'economy', 'market')),
+    ('url', 'Tech', ('tech', 'technology', 'science')),
+    ('url', 'Entertainment', ('entertainment', 'movie', 'film')),
+    ('url', 'Politics', ('politics', 'election', 'government')),
+    ('content', 'Politics', ('politics', 'election')),
+    ('content', 'Sports', ('sport', 'match')),
+    ('content', 'Business', ('business', 'stock')),
+    ('content', 'Entertainment', ('movie', 'cinema')),
+    ('content', 'Tech', ('technology', 'software')),
+)
+
+
+def compile_keywords(keywords):
+    # Longest first so the alternation never stops at a shorter prefix
+    alternatives = sorted(set(keywords), key=len, reverse=True)
+    return re.compile('|'.join(re.escape(k) for k in alternatives), re.IGNORECASE)
+
+
+class CategoryClassifier:
+    """Categorises articles from (field, category, keywords) rules, first match wins."""
+
+    def __init__(self, rules=DEFAULT_RULES, default=DEFAULT_CATEGORY):
+        self.rules = [(field, category, compile_keywords(keywords)) for field, category, keywords in rules]
+        self.default = default
+
+    def classify(self, df):
+        """Returns an array with the category of every row of `df`."""
+        result = np.full(len(df), self.default, dtype=object)
+        pending = np.ones(len(df), dtype=bool)
+        columns = {}
+        for field, category, pattern in self.rules:
+            if not pending.any():
+                break
+            if field not in columns:
+                columns[field] = df[field].fillna('').astype(str).to_numpy(dtype=object)
+            values = pd.Series(columns[field][pending])
+            hit = values.str.contains(pattern, regex=True).to_numpy(dtype=bool)
+            matched = np.flatnonzero(pending)[hit]
+            result[matched] = category
+            pending[matched] = False
+        return result
@@ -0,0 +1,203 @@
+"""
+Chart rendering.
+
+Each chart is described by a small, JSON-serialisable spec (kind, title and the
+aggregate to draw, e.g. value counts or a top-10 list). Specs are rendered
+independently, optionally in a process pool, and every rendered image is
+cached on disk under the hash of its spec so an unchanged chart is never drawn
+twice. Because the image is a pure function of the spec, that hash also names
+the image for HTTP caching. Specs with `'format': 'svg'` render to SVG.
+
+This module does not depend on Django so pool workers can import it on any
+platform without configuring settings.
+"""
+import atexit
+import base64
+import hashlib
+import json
+import multiprocessing
+import os
+import tempfile
+import threading
+from concurrent.futures import ProcessPoolExecutor
+
+
+CONTENT_TYPES = {
+    'png': 'image/png',
+    'svg': 'image/svg+xml',
+}
+
+
+def chart_key(spec):
+    payload = json.dumps(spec, sort_keys=True, separators=(',', ':'))
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+def _bar(plt, sns, spec):
+    sns.barplot(x=spec['labels'], y=spec['values'], palette=spec.get('palette', 'viridis'))
+    plt.xticks(rotation=spec.get('rotation', 0), ha=spec.get('ha', 'center'))
+
+
+def _hbar(plt, sns, spec):
+    sns.barplot(x=spec['values'], y=spec['labels'], palette=spec.get('palette', 'magma'))
+
+
+def _stacked_bar(plt, sns, spec):
+    import pandas as pd
+    frame = pd.DataFrame(spec['values'], index=spec['index'], columns=spec['columns'])
+    frame.plot(kind='bar', stacked=True, figsize=spec['figsize'], colormap='viridis', ax=plt.gca())
+    plt.xticks(rotation=45)
+
+
+def _pie(plt, sns, spec):
+    plt.pie(spec['values'], labels=spec['labels'], autopct='%1.1f%%', startangle=140,
+            colors=sns.color_palette('pastel'))
+
+
+def _heatmap(plt, sns, spec):
+    import pandas as pd
+    frame = pd.DataFrame(spec['values'], index=spec['index'], columns=spec['columns'])
+    sns.heatmap(frame, annot=True, fmt='d', cmap='YlGnBu')
+
+
+_RENDERERS = {
+    'bar': _bar,
+    'hbar': _hbar,
+    'stacked_bar': _stacked_bar,
+    'pie': _pie,
+    'heatmap': _heatmap,
+}
+
+
+def render_chart(spec):
+    """Draws one chart spec and returns the image bytes (PNG unless the spec asks for SVG)."""
+    import io
+    import matplotlib
+    matplotlib.use('Agg')
+    import matplotlib.pyplot as plt
+    import seaborn as sns
+    sns.set_theme(style="whitegrid")
+
+    plt.figure(figsize=spec['figsize'])
+    try:
+        _RENDERERS[spec['kind']](plt, sns, spec)
+        plt.title(spec['title'])
+        if 'xlabel' in spec:
+            plt.xlabel(spec['xlabel'])
+        if 'ylabel' in spec:
+            plt.ylabel(spec['ylabel'])
+        plt.tight_layout()
+        buf = io.BytesIO()
+        plt.savefig(buf, format=spec.get('format', 'png'), bbox_inches='tight' if spec.get('tight') else None)
+        return buf.getvalue()
+    finally:
+        plt.close('all')
+
+
+class ChartCache:
+    """Rendered charts on disk, keyed by the hash of their spec."""
+
+    def __init__(self, directory):
+        self.directory = str(directory)
+        os.makedirs(self.directory, exist_ok=True)
+
+    def path(self, key, fmt='png'):
+        return os.path.join(self.directory, f"{key}.{fmt}")
+
+    def exists(self, key, fmt='png'):
+        return os.path.exists(self.path(key, fmt))
+
+    def get(self, key, fmt='png'):
+        try:
+            with open(self.path(key, fmt), 'rb') as f:
+                return f.read()
+        except OSError:
+            return None
+
+    def put(self, key, data, fmt='png'):
+        fd, tmp = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+        os.replace(tmp, self.path(key, fmt))
+
+
+_pool = None
+_pool_workers = 0
+_pool_lock = threading.Lock()
+
+
+def _pool_context():
+    # Forking a process with live fetch and job threads can copy a lock held by
+    # one of them into the child, which then deadlocks on it
+    methods = multiprocessing.get_all_start_methods()
+    return multiprocessing.get_context('forkserver' if 'forkserver' in methods else 'spawn')
+
+
+def _get_pool(workers):
+    global _pool, _pool_workers
+    with _pool_lock:
+        if _pool is not None and _pool_workers != workers:
+            # Charts already submitted still finish
+            _pool.shutdown(wait=False)
+            _pool = None
+        if _pool is None:
+            _pool = ProcessPoolExecutor(max_workers=workers, mp_context=_pool_context())
+            _pool_workers = workers
+        return _pool
+
+
+@atexit.register
+def shutdown_pool():
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(wait=True, cancel_futures=True)
+            _pool = None
+
+
+def render_charts(specs, cache=None, workers=0, progress=None):
+    """
+    Renders `specs` ({name: spec}) and returns {name: (key, fmt, data)}. Charts
+    already in `cache` are not drawn again and come back with `data` None; the
+    rest are drawn in a process pool of `workers` processes, or inline when
+    `workers` is 0. `progress(plotted=n)` is called as charts finish.
+    """
+    charts = {}
+    todo = {}
+    for name, spec in specs.items():
+        key = chart_key(spec)
+        fmt = spec.get('format', 'png')
+        if cache is not None and cache.exists(key, fmt):
+            charts[name] = (key, fmt, None)
+        else:
+            todo[name] = (key, fmt, spec)
+
+    def done(name, key, fmt, data):
+        charts[name] = (key, fmt, data)
+        if cache is not None:
+            cache.put(key, data, fmt)
+        if progress:
+            progress(plotted=len(charts))
+
+    if progress and charts:
+        progress(plotted=len(charts))
+    if workers and len(todo) > 1:
+        pool = _get_pool(workers)
+        futures = {name: (key, fmt, pool.submit(render_chart, spec)) for name, (key, fmt, spec) in todo.items()}
+        for name, (key, fmt, future) in futures.items():
+            try:
+                done(name, key, fmt, future.result())
+            except Exception as e:
+                print(f"Chart {name} failed: {e}")
+    else:
+        for name, (key, fmt, spec) in todo.items():
+            try:
+                done(name, key, fmt, render_chart(spec))
+            except Exception as e:
+                print(f"Chart {name} failed: {e}")
+
+    return charts
+
+
+def data_uri(fmt, data):
+    return f"data:{CONTENT_TYPES[fmt]};base64,{base64.b64encode(data).decode('utf-8')}"
@@ -0,0 +1,68 @@
+"""
+Streaming text chunker.
+
+Chunks are produced lazily as (start, end) offsets into the original string, so
+analysers can scan the text in place (e.g. `pattern.finditer(text, start, end)`)
+instead of holding copies of every overlapping slice. Boundaries can optionally
+be snapped to word or sentence edges so no chunk starts or ends mid-word.
+"""
+import re
+
+# End of a sentence: terminal punctuation, optional closing quotes/brackets, then
+# whitespace or (for text extracted without separators) the next capital letter.
+_SENTENCE_END_RE = re.compile(r"[.!?][\"'”’)\]]*(?:\s+|(?=[A-Z]))")
+_SNAP_MODES = (None, 'word', 'sentence')
+
+
+def _snap_end(text, start, end, snap):
+    # Never shrink a chunk below half its size just to find a boundary
+    floor = start + (end - start) // 2
+    if snap == 'sentence':
+        last = None
+        for match in _SENTENCE_END_RE.finditer(text, floor, end):
+            last = match
+        if last is not None:
+            return last.end()
+    # 'word', and the fallback for sentences longer than half a chunk
+    cut = text.rfind(' ', floor, end)
+    return cut + 1 if cut != -1 else end
+
+
+def _snap_start(text, start, end):
+    if start == 0 or text[start - 1].isspace():
+        return start
+    nxt = text.find(' ', start, end)
+    return nxt + 1 if nxt != -1 else start
+
+
+def iter_chunk_spans(text, chunk_size=500, overlap=50, snap=None):
+    """
+    Yields (start, end) offsets of chunks of about `chunk_size` characters that
+    overlap by about `overlap` characters. `snap` is None (cut anywhere), 'word'
+    or 'sentence'.
+    """
+    if snap not in _SNAP_MODES:
+        raise ValueError(f"Unknown snap mode: {snap}")
+    if not text:
+        return
+    text_len = len(text)
+    start = 0
+    while start < text_len:
+        end = min(start + chunk_size, text_len)
+        if snap and end < text_len:
+            end = _snap_end(text, start, end, snap)
+        yield start, end
+        if end >= text_len:
+            break
+        next_start = end - overlap
+        if snap:
+            next_start = _snap_start(text, next_start, end)
+        start = max(next_start, start + 1)
+
+
+def chunk_text(text, chunk_size=500, overlap=50, snap=None):
+    """
+    Splits text into chunks of `chunk_size` characters with `overlap`, lazily.
+    """
+    for start, end in iter_chunk_spans(text, chunk_size, overlap, snap):
+        yield text[start:end]
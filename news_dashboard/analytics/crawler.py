@@ -0,0 +1,249 @@
+"""
+Multi-site crawl engine.
+
+A crawl starts from any number of seed URLs and walks a deduplicating
+breadth-first frontier: seed and section pages are parsed for article links
+(and, up to `max_depth`, for further section pages on the same site). Pages of
+different sites are fetched concurrently. Fetchers given a `DomainLimiter`
+keep every site polite: at most `connections` requests in flight per host and
+at least `delay` seconds between them, or the site's robots.txt Crawl-delay
+when that is longer. URLs disallowed by robots.txt are never crawled.
+"""
+import re
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from urllib.parse import urljoin, urlsplit, urlunsplit
+from urllib.robotparser import RobotFileParser
+
+import requests
+
+from .dedup import canonicalize_url
+from .fetchers import USER_AGENT, get_soup
+
+ARTICLE_URL_PATTERN = r'/article'
+_SEED_SPLIT_RE = re.compile(r'[\s,]+')
+
+
+def parse_seeds(value):
+    """Splits a string of URLs separated by whitespace or commas into a list."""
+    if isinstance(value, (list, tuple)):
+        return [v for v in value if v]
+    return [v for v in _SEED_SPLIT_RE.split(value or '') if v]
+
+
+def host_of(url):
+    return (urlsplit(url).hostname or '').lower()
+
+
+def site_of(url):
+    host = host_of(url)
+    return host[4:] if host.startswith('www.') else host
+
+
+def for_site(mapping, url, default=None):
+    """The value of `mapping` ({domain: value}) for the host of `url` or its closest parent domain."""
+    host = host_of(url)
+    while host:
+        if host in mapping:
+            return mapping[host]
+        host = host.partition('.')[2]
+    return default
+
+
+def normalize_link(base, href):
+    """Resolves `href` against `base` into its canonical URL; None for non-HTTP links."""
+    parts = urlsplit(urljoin(base, href.strip()))
+    if parts.scheme not in ('http', 'https') or not parts.netloc:
+        return None
+    return canonicalize_url(urlunsplit(parts))
+
+
+class RobotsCache:
+    """robots.txt rules per host, fetched once on first use."""
+
+    def __init__(self, user_agent=USER_AGENT, timeout=10):
+        self.user_agent = user_agent
+        self.timeout = timeout
+        self._parsers = {}
+        self._lock = threading.Lock()
+        self._host_locks = defaultdict(threading.Lock)
+
+    def _parser(self, url):
+        parts = urlsplit(url)
+        host = parts.netloc.lower()
+        with self._lock:
+            host_lock = self._host_locks[host]
+        with host_lock:
+            if host not in self._parsers:
+                parser = RobotFileParser()
+                try:
+                    response = requests.get(
+                        f"{parts.scheme}://{host}/robots.txt",
+                        headers={'User-Agent': self.user_agent},
+                        timeout=self.timeout,
+                    )
+                    if response.status_code in (401, 403):
+                        parser.disallow_all = True
+                    elif response.ok:
+                        parser.parse(response.text.splitlines())
+                    else:
+                        parser.allow_all = True
+                except requests.RequestException as e:
+                    print(f"robots.txt unavailable for {host}: {e}")
+                    parser.allow_all = True
+                self._parsers[host] = parser
+            return self._parsers[host]
+
+    def allowed(self, url):
+        return self._parser(url).can_fetch(self.user_agent, url)
+
+    def crawl_delay(self, url):
+        return self._parser(url).crawl_delay(self.user_agent) or 0
+
+
+class DomainLimiter:
+    """Per-host connection caps and minimum request spacing."""
+
+    def __init__(self, delay=1.0, connections=2, robots=None):
+        self.delay = delay
+        self.connections = connections
+        self.robots = robots
+        self._lock = threading.Lock()
+        self._slots = {}
+        self._next_at = defaultdict(float)
+
+    def delay_for(self, url):
+        delay = self.delay
+        if self.robots is not None:
+            delay = max(delay, self.robots.crawl_delay(url))
+        return delay
+
+    @contextmanager
+    def slot(self, url):
+        """Holds one of the host's connections, waiting for its turn first."""
+        host = host_of(url)
+        with self._lock:
+            semaphore = self._slots.get(host)
+            if semaphore is None:
+                semaphore = self._slots[host] = threading.BoundedSemaphore(self.connections)
+        delay = self.delay_for(url)
+        with semaphore:
+            with self._lock:
+                now = time.monotonic()
+                start = max(now, self._next_at[host])
+                self._next_at[host] = start + delay
+            if start > now:
+                time.sleep(start - now)
+            yield
+
+
+class Crawler:
+    """
+    Discovers article links from many seeds. `fetcher_factory` returns a new
+    Fetcher (normally one sharing a DomainLimiter); one is opened per worker
+    thread. `ready_selectors` maps a site ("example.com") to the selectors its
+    index pages need before links can be read, and `article_patterns` to the
+    pattern of its article paths; other sites use `article_pattern`.
+    """
+
+    def __init__(self, fetcher_factory, robots=None, max_depth=0, max_articles=200,
+                 max_articles_per_site=50, max_pages_per_site=20, workers=8,
+                 link_selector='a[href]', ready_selectors=None, article_patterns=None,
+                 article_pattern=None):
+        self.fetcher_factory = fetcher_factory
+        self.robots = robots
+        self.max_depth = max_depth
+        self.max_articles = max_articles
+        self.max_articles_per_site = max_articles_per_site
+        self.max_pages_per_site = max_pages_per_site
+        self.workers = workers
+        self.link_selector = link_selector
+        self.ready_selectors = ready_selectors or {}
+        self.article_patterns = {site: re.compile(p) for site, p in (article_patterns or {}).items()}
+        self.article_re = re.compile(article_pattern or ARTICLE_URL_PATTERN)
+
+    def is_article(self, url):
+        pattern = for_site(self.article_patterns, url, self.article_re)
+        return bool(pattern.search(urlsplit(url).path))
+
+    def _allowed(self, url):
+        return self.robots is None or self.robots.allowed(url)
+
+    def crawl(self, seeds):
+        """Returns the article URLs found from `seeds`, in discovery order."""
+        seeds = list(dict.fromkeys(s for s in (normalize_link(seed, seed) for seed in parse_seeds(seeds)) if s))
+        local = threading.local()
+        fetchers = []
+        fetchers_lock = threading.Lock()
+
+        def worker_fetcher():
+            fetcher = getattr(local, 'fetcher', None)
+            if fetcher is None:
+                fetcher = local.fetcher = self.fetcher_factory()
+                with fetchers_lock:
+                    fetchers.append(fetcher)
+            return fetcher
+
+        def fetch_links(url):
+            if not self._allowed(url):
+                print(f"Disallowed by robots.txt: {url}")
+                return url, []
+            required = tuple(for_site(self.ready_selectors, url, ()))
+            soup = get_soup(worker_fetcher(), url, required=required, revalidate=True, keep=(self.link_selector,))
+            if not soup:
+                return url, []
+            links = []
+            for tag in soup.select(self.link_selector):
+                href = tag.get('href')
+                link = normalize_link(url, href) if href else None
+                if link:
+                    links.append(link)
+            return url, links
+
+        seen = set(seeds)
+        articles = []
+        per_site = defaultdict(int)
+        pages_per_site = defaultdict(int)
+        level = []
+        for seed in seeds:
+            pages_per_site[site_of(seed)] += 1
+            level.append(seed)
+        depth = 0
+        executor = ThreadPoolExecutor(max_workers=max(1, self.workers))
+        try:
+            while level and len(articles) < self.max_articles:
+                next_level = []
+                # map keeps the frontier order, so results stay deterministic
+                for page, links in executor.map(fetch_links, level):
+                    site = site_of(page)
+                    for link in links:
+                        if link in seen or site_of(link) != site:
+                            continue
+                        if self.is_article(link):
+                            if per_site[site] >= self.max_articles_per_site or len(articles) >= self.max_articles:
+                                continue
+                            seen.add(link)
+                            if not self._allowed(link):
+                                continue
+                            per_site[site] += 1
+                            articles.append(link)
+                        elif depth < self.max_depth and pages_per_site[site] < self.max_pages_per_site:
+                            seen.add(link)
+                            pages_per_site[site] += 1
+                            next_level.append(link)
+                level = next_level
+                depth += 1
+        finally:
+            executor.shutdown(wait=True, cancel_futures=True)
+            for fetcher in fetchers:
+                try:
+                    fetcher.close()
+                except Exception:
+                    pass
+
+        print(f"Crawled {sum(pages_per_site.values())} page(s) on {len(pages_per_site)} site(s), "
+              f"found {len(articles)} article(s)")
+        return articles
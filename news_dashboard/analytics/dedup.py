@@ -0,0 +1,145 @@
+"""
+URL canonicalisation and near-duplicate detection.
+
+`canonicalize_url` maps the many URLs of one page (tracking parameters,
+fragments, AMP variants, default ports, parameter order) to a single form, so
+the crawler fetches each page once. After extraction, `simhash` gives every
+article body a 64-bit fingerprint of its word shingles: syndicated copies and
+lightly edited versions of a story land within a few bits of each other.
+`SimHashIndex` finds such neighbours with the banding trick: the fingerprint is
+cut into `bands` pieces, and any two fingerprints within `bands - 1` bits of
+each other must agree on at least one piece, so only exact band matches need a
+Hamming check.
+"""
+import hashlib
+import json
+import os
+import re
+import tempfile
+from collections import defaultdict
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+import numpy as np
+
+BITS = 64
+BANDS = 4
+MAX_DISTANCE = 3
+# Shorter texts do not carry enough shingles for a meaningful fingerprint
+MIN_TOKENS = 20
+
+TRACKING_PARAMS = frozenset({
+    'fbclid', 'gclid', 'dclid', 'msclkid', 'mc_cid', 'mc_eid', 'igshid',
+    'ref', 'ref_src', 'ref_url', 'cmpid', 'ito', 'ocid', '_ga',
+})
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+_AMP_RE = re.compile(r'(?:/amp/?|\.amp)$')
+_SLASHES_RE = re.compile(r'/{2,}')
+
+
+def canonicalize_url(url):
+    """Returns the canonical form of `url`; two URLs of the same page should compare equal."""
+    parts = urlsplit(url.strip())
+    scheme = parts.scheme.lower()
+    host = (parts.hostname or '').lower()
+    port = parts.port
+    if port and not (scheme == 'http' and port == 80 or scheme == 'https' and port == 443):
+        host = f"{host}:{port}"
+    path = _SLASHES_RE.sub('/', parts.path) or '/'
+    path = _AMP_RE.sub('', path) or '/'
+    query = sorted(
+        (k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True)
+        if not k.lower().startswith('utm_') and k.lower() not in TRACKING_PARAMS
+    )
+    return urlunsplit((scheme, host, path, urlencode(query), ''))
+
+
+def _hashes(tokens, shingle):
+    grams = [" ".join(tokens[i:i + shingle]) for i in range(max(1, len(tokens) - shingle + 1))]
+    grams, counts = np.unique(np.array(grams), return_counts=True)
+    hashes = np.fromiter(
+        (int.from_bytes(hashlib.blake2b(g.encode('utf-8'), digest_size=8).digest(), 'little') for g in grams),
+        dtype=np.uint64,
+        count=len(grams),
+    )
+    return hashes, counts
+
+
+def simhash(text, shingle=3):
+    """64-bit SimHash of the word shingles of `text`, or None for very short texts."""
+    tokens = _TOKEN_RE.findall(str(text or '').lower())
+    if len(tokens) < MIN_TOKENS:
+        return None
+    hashes, counts = _hashes(tokens, shingle)
+    bits = (hashes[:, None] >> np.arange(BITS, dtype=np.uint64)) & np.uint64(1)
+    votes = (np.where(bits == 1, 1, -1) * counts[:, None]).sum(axis=0)
+    # Python ints: shifting a numpy int64 into bit 63 overflows to a negative value
+    return sum(1 << int(i) for i in np.flatnonzero(votes > 0))
+
+
+def hamming(a, b):
+    return bin(a ^ b).count('1')
+
+
+def bands_of(fingerprint, bands=BANDS):
+    width = BITS // bands
+    mask = (1 << width) - 1
+    return [(fingerprint >> (i * width)) & mask for i in range(bands)]
+
+
+def to_signed(fingerprint):
+    """Fingerprint as a signed 64-bit integer, for databases without unsigned columns."""
+    return fingerprint - (1 << BITS) if fingerprint >= 1 << (BITS - 1) else fingerprint
+
+
+def to_unsigned(value):
+    return value + (1 << BITS) if value < 0 else value
+
+
+class SimHashIndex:
+    """In-memory banded index of fingerprints by key, optionally persisted as JSON."""
+
+    def __init__(self, max_distance=MAX_DISTANCE, bands=BANDS):
+        self.max_distance = max_distance
+        self.bands = bands
+        self.fingerprints = {}
+        self._buckets = defaultdict(set)
+
+    def add(self, key, fingerprint):
+        if fingerprint is None:
+            return
+        self.fingerprints[key] = fingerprint
+        for i, band in enumerate(bands_of(fingerprint, self.bands)):
+            self._buckets[(i, band)].add(key)
+
+    def near(self, fingerprint):
+        """Returns the key of the closest indexed fingerprint within `max_distance`, or None."""
+        if fingerprint is None:
+            return None
+        best = None
+        for i, band in enumerate(bands_of(fingerprint, self.bands)):
+            for key in self._buckets.get((i, band), ()):
+                distance = hamming(fingerprint, self.fingerprints[key])
+                if distance <= self.max_distance and (best is None or distance < best[0]):
+                    best = (distance, key)
+        return best[1] if best else None
+
+    def save(self, path):
+        directory = os.path.dirname(str(path)) or '.'
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=directory, suffix='.tmp')
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            json.dump({'max_distance': self.max_distance, 'bands': self.bands,
+                       'fingerprints': self.fingerprints}, f)
+        os.replace(tmp, str(path))
+
+    @classmethod
+    def load(cls, path):
+        try:
+            with open(str(path), encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return cls()
+        index = cls(data.get('max_distance', MAX_DISTANCE), data.get('bands', BANDS))
+        for key, fingerprint in data.get('fingerprints', {}).items():
+            index.add(key, fingerprint)
+        return index
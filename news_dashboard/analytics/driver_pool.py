@@ -0,0 +1,144 @@
+"""
+Process-wide pool of warm headless Chrome drivers.
+
+Launching Chrome costs seconds and a few hundred MB, so instead of starting a
+browser per dashboard request the Selenium fetcher checks a driver out of this
+pool and returns it afterwards. Drivers are health-checked on checkout and
+recycled after `max_pages` pages or when they crash; all of them are quit when
+the process exits.
+"""
+import atexit
+import queue
+import threading
+import time
+from contextlib import contextmanager
+
+from selenium.common.exceptions import WebDriverException
+
+from .fetchers import get_driver
+
+
+class DriverPool:
+    def __init__(self, size=2, max_pages=100, factory=get_driver, checkout_timeout=120):
+        self.size = size
+        self.max_pages = max_pages
+        self.factory = factory
+        self.checkout_timeout = checkout_timeout
+        # LIFO so the most recently used (warmest) driver is handed out first
+        self._idle = queue.LifoQueue()
+        self._pages = {}
+        self._starting = 0
+        self._lock = threading.Lock()
+        self._closed = False
+
+    def _is_healthy(self, driver):
+        try:
+            driver.execute_script('return 1')
+            return True
+        except WebDriverException:
+            return False
+
+    def _discard(self, driver):
+        with self._lock:
+            self._pages.pop(id(driver), None)
+        try:
+            driver.quit()
+        except Exception:
+            pass
+
+    def _new_driver(self):
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("Driver pool is shut down")
+            if len(self._pages) + self._starting >= self.size:
+                return None
+            # Reserve the slot before the (slow) browser launch
+            self._starting += 1
+        try:
+            driver = self.factory()
+        finally:
+            with self._lock:
+                self._starting -= 1
+        with self._lock:
+            self._pages[id(driver)] = 0
+        return driver
+
+    def acquire(self):
+        deadline = time.monotonic() + self.checkout_timeout
+        while True:
+            try:
+                driver = self._idle.get_nowait()
+            except queue.Empty:
+                driver = self._new_driver()
+                if driver is not None:
+                    return driver
+                if time.monotonic() >= deadline:
+                    raise TimeoutError("No browser available in the driver pool")
+                # Wake up regularly: a recycled driver frees a slot without
+                # putting anything back in the idle queue.
+                try:
+                    driver = self._idle.get(timeout=1)
+                except queue.Empty:
+                    continue
+            if self._is_healthy(driver):
+                return driver
+            print("Discarding unhealthy browser from pool")
+            self._discard(driver)
+
+    def release(self, driver, broken=False):
+        with self._lock:
+            pages = self._pages.get(id(driver), 0) + 1
+            self._pages[id(driver)] = pages
+            closed = self._closed
+        if broken or closed or pages >= self.max_pages:
+            self._discard(driver)
+        else:
+            self._idle.put(driver)
+
+    @contextmanager
+    def driver(self):
+        driver = self.acquire()
+        broken = False
+        try:
+            yield driver
+        except WebDriverException:
+            broken = True
+            raise
+        finally:
+            self.release(driver, broken=broken)
+
+    def warm(self, count=None):
+        """Starts up to `count` browsers ahead of time (default: the pool size)."""
+        for _ in range(count or self.size):
+            try:
+                driver = self._new_driver()
+            except Exception as e:
+                print(f"Could not start a browser for the pool: {e}")
+                break
+            if driver is None:
+                break
+            self._idle.put(driver)
+
+    def shutdown(self):
+        with self._lock:
+            self._closed = True
+        while True:
+            try:
+                driver = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            self._discard(driver)
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_pool(size=2, max_pages=100):
+    """Returns the process-wide pool, creating it with the given limits on first use."""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = DriverPool(size=size, max_pages=max_pages)
+            atexit.register(_pool.shutdown)
+        return _pool
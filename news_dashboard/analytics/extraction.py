@@ -0,0 +1,208 @@
+"""
+Per-site extraction profiles, loaded from a JSON registry: compiled selectors
+for every article field in fallback order, the boilerplate to strip from the
+body, the pattern of the site's article URLs, and hit/miss counts per selector.
+"""
+import json
+import os
+import re
+import threading
+from collections import Counter
+from datetime import datetime
+from urllib.parse import urlsplit
+
+import soupsieve as sv
+
+DEFAULT_PROFILES_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'extraction_profiles.json')
+DEFAULT_PROFILE = 'default'
+
+
+class ExtractionProfile:
+    """Compiled selectors for the sites in `domains`."""
+
+    def __init__(self, name, domains=(), ready=(), index_ready=(), headline=(), date=(), content=(),
+                 drop=(), junk=(), trailing=(), category=None, article_pattern=None):
+        self.name = name
+        self.domains = tuple(d.lower() for d in domains)
+        self.article_pattern = article_pattern
+        # Kept as strings: the fetchers pass them on to the browser
+        self.ready = tuple(ready)
+        self.index_ready = tuple(index_ready)
+        self.headline = [sv.compile(sel) for sel in headline]
+        self.date = [(sv.compile(rule['selector']), rule.get('attr')) for rule in date]
+        self.content = [(sv.compile(rule['selector']), rule.get('all', False)) for rule in content]
+        self.drop = [sv.compile(sel) for sel in drop]
+        self.junk = [re.compile(pattern) for pattern in junk]
+        self.trailing = [re.compile(pattern) for pattern in trailing]
+        self.category = category or {}
+        # Everything extract() reads, so the parser can skip the rest of the page
+        self.keep = tuple(dict.fromkeys(
+            tuple(headline) + tuple(rule['selector'] for rule in date) + tuple(rule['selector'] for rule in content)
+        ))
+        self.stats = Counter()
+        self._stats_lock = threading.Lock()
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(
+            data['name'],
+            domains=data.get('domains', ()),
+            ready=data.get('ready', ()),
+            index_ready=data.get('index_ready', ()),
+            headline=data.get('headline', ()),
+            date=data.get('date', ()),
+            content=data.get('content', ()),
+            drop=data.get('drop', ()),
+            junk=data.get('junk', ()),
+            trailing=data.get('trailing', ()),
+            category=data.get('category'),
+            article_pattern=data.get('article_pattern'),
+        )
+
+    def _count(self, key, n):
+        with self._stats_lock:
+            self.stats[key] += n
+
+    def _record(self, field, index):
+        # index is the position of the selector that matched, None for a miss
+        key = f"{field}.{index}" if index is not None else f"{field}.miss"
+        with self._stats_lock:
+            self.stats[key] += 1
+
+    def _first(self, field, rules, extract):
+        for index, rule in enumerate(rules):
+            value = extract(rule)
+            if value:
+                self._record(field, index)
+                return value
+        self._record(field, None)
+        return None
+
+    def _headline(self, soup):
+        def extract(pattern):
+            tag = pattern.select_one(soup)
+            return tag.get_text(strip=True) if tag else None
+        return self._first('headline', self.headline, extract)
+
+    def _date(self, soup):
+        def extract(rule):
+            pattern, attr = rule
+            tag = pattern.select_one(soup)
+            if tag is None:
+                return None
+            return tag.get(attr) if attr else tag.get_text(strip=True)
+        return self._first('date', self.date, extract)
+
+    def _drop_widgets(self, element):
+        # select() only returns descendants, so a broad rule can never remove
+        # the content element itself or a wrapper around it
+        removed = 0
+        for pattern in self.drop:
+            for tag in pattern.select(element):
+                if tag.decomposed:
+                    continue
+                removed += len(tag.get_text(strip=True).encode('utf-8'))
+                tag.decompose()
+        return removed
+
+    def _content(self, soup):
+        """Returns the body text, without widgets, and the widget bytes removed."""
+        removed = 0
+
+        def extract(rule):
+            nonlocal removed
+            pattern, select_all = rule
+            if select_all:
+                tags = pattern.select(soup)
+            else:
+                tag = pattern.select_one(soup)
+                tags = [tag] if tag is not None else []
+            for tag in tags:
+                if not tag.decomposed:
+                    removed += self._drop_widgets(tag)
+            return " ".join(tag.get_text(strip=True) for tag in tags if not tag.decomposed)
+        return self._first('content', self.content, extract), removed
+
+    def strip_text(self, text):
+        """Returns `text` without the junk and trailing patterns, and the bytes removed."""
+        before = len(text.encode('utf-8'))
+        for pattern in self.junk:
+            text = pattern.sub('', text)
+        cut = min((m.start() for m in (p.search(text) for p in self.trailing) if m), default=None)
+        if cut is not None:
+            text = text[:cut]
+        text = text.strip()
+        return text, before - len(text.encode('utf-8'))
+
+    def category_for(self, url):
+        """The section named in the URL path, e.g. /news/national/ -> 'National'."""
+        parts = urlsplit(url).path.split('/')
+        after = self.category.get('after_segment')
+        if after and after in parts:
+            idx = parts.index(after)
+            if idx + 1 < len(parts) and parts[idx + 1]:
+                return parts[idx + 1].capitalize()
+        for segment in self.category.get('segments', ()):
+            if segment in parts:
+                return segment.capitalize()
+        return self.category.get('default', 'General')
+
+    def extract(self, url, soup):
+        """
+        Returns the article fields of `soup`, a parsed page of `url`. Widget
+        nodes inside the content elements are removed from `soup`.
+        """
+        headline = self._headline(soup) or "N/A"
+        date = self._date(soup) or str(datetime.now().date())
+        content, removed = self._content(soup)
+        content, stripped = self.strip_text(content or "")
+        removed += stripped
+        self._count('boilerplate_bytes', removed)
+        return {
+            'url': url,
+            'headline': headline,
+            'category': self.category_for(url),
+            'date': date,
+            'content': content,
+            'boilerplate_bytes': removed,
+        }
+
+    def stats_snapshot(self):
+        with self._stats_lock:
+            return dict(self.stats)
+
+
+class ProfileRegistry:
+    """Extraction profiles by domain; sites without a profile get the default one."""
+
+    def __init__(self, profiles):
+        self.profiles = {p.name: p for p in profiles}
+        self.default = self.profiles.get(DEFAULT_PROFILE) or ExtractionProfile(DEFAULT_PROFILE)
+        self._by_domain = {d: p for p in profiles for d in p.domains}
+
+    @classmethod
+    def from_file(cls, path=DEFAULT_PROFILES_PATH):
+        with open(str(path), encoding='utf-8') as f:
+            data = json.load(f)
+        return cls([ExtractionProfile.from_dict(p) for p in data['profiles']])
+
+    def for_url(self, url):
+        host = (urlsplit(url).hostname or '').lower()
+        # Match the host and then each parent domain: www.example.com, example.com, com
+        while host:
+            profile = self._by_domain.get(host)
+            if profile is not None:
+                return profile
+            host = host.partition('.')[2]
+        return self.default
+
+    def index_ready(self):
+        """{domain: selectors} that a site's index pages need before links can be read."""
+        return {d: p.index_ready for d, p in self._by_domain.items() if p.index_ready}
+
+    def article_patterns(self):
+        """{domain: pattern} matching the paths of a site's article URLs."""
+        return {d: p.article_pattern for d, p in self._by_domain.items() if p.article_pattern}
+
+    def stats(self):
+        return {name: p.stats_snapshot() for name, p in self.profiles.items()}
@@ -0,0 +1,281 @@
+"""
+Page fetching backends.
+
+Every backend implements the small `Fetcher` interface: `fetch(url)` returns the
+page HTML and `get_soup(url, required)` returns a parsed BeautifulSoup. The plain
+HTTP backend is the default; it hands a page over to headless Chrome only when
+the selectors the extractor needs are missing from the static HTML.
+"""
+import codecs
+import re
+import threading
+import time
+from contextlib import nullcontext
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+from selenium import webdriver
+from selenium.common.exceptions import TimeoutException
+from selenium.webdriver.chrome.options import Options
+from selenium.webdriver.common.by import By
+from selenium.webdriver.support.ui import WebDriverWait
+
+from .parsing import parse_html
+
+USER_AGENT = (
+    "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 "
+    "(KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
+)
+
+# <meta charset="..."> or <meta http-equiv="Content-Type" content="...; charset=...">
+_META_CHARSET_RE = re.compile(rb'<meta[^>]+charset\s*=\s*["\']?\s*([\w.:-]+)', re.IGNORECASE)
+
+_adapter = None
+_adapter_lock = threading.Lock()
+
+
+def _shared_adapter(pool_size):
+    # One urllib3 pool for the whole process so keep-alive connections are
+    # reused across workers instead of per session.
+    global _adapter
+    with _adapter_lock:
+        if _adapter is None:
+            _adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=2)
+        return _adapter
+
+
+def decode_body(response):
+    """
+    The text of `response`. Without a charset in the Content-Type, requests
+    falls back to ISO-8859-1 for HTML; use the encoding the page declares, or
+    the detected one, instead.
+    """
+    if 'charset' not in response.headers.get('Content-Type', '').lower():
+        match = _META_CHARSET_RE.search(response.content[:8192])
+        encoding = match.group(1).decode('ascii') if match else None
+        try:
+            codecs.lookup(encoding or '')
+        except LookupError:
+            encoding = response.apparent_encoding
+        response.encoding = encoding or 'utf-8'
+    return response.text
+
+
+def get_driver(headless=True):
+    options = Options()
+    if headless:
+        options.add_argument('--headless')
+    options.add_argument('--disable-gpu')
+    options.add_argument('--no-sandbox')
+    # Suppress logging
+    options.add_argument('log-level=3')
+    driver = webdriver.Chrome(options=options)
+    return driver
+
+
+def _keep(keep, required):
+    # The readiness check runs on the soup, so required selectors are always kept
+    return tuple(keep) + tuple(required) if keep else None
+
+
+def missing_selectors(soup, selectors):
+    return [sel for sel in selectors if soup.select_one(sel) is None]
+
+
+class Fetcher:
+    """
+    Base fetcher: subclasses implement `fetch` and may override `close`.
+    `last_ready_seconds` holds how long the last page took to become usable.
+    A `limiter` (crawler.DomainLimiter) paces every request that goes out to
+    the network.
+    """
+
+    name = 'base'
+    last_ready_seconds = None
+    limiter = None
+
+    def slot(self, url):
+        return self.limiter.slot(url) if self.limiter is not None else nullcontext()
+
+    def fetch(self, url, ready=(), revalidate=False):
+        raise NotImplementedError
+
+    def get_soup(self, url, required=(), revalidate=False, keep=None):
+        html = self.fetch(url, ready=required, revalidate=revalidate)
+        if html is None:
+            return None
+        return parse_html(html, _keep(keep, required))
+
+    def close(self):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class SeleniumFetcher(Fetcher):
+    """
+    Renders pages in headless Chrome. With a `pool` every page checks a warm
+    driver out of it; otherwise the fetcher starts its own browser on first use.
+    Instead of sleeping a fixed time, `fetch` returns as soon as every `ready`
+    selector is in the DOM, or after the per-site timeout.
+    """
+
+    name = 'selenium'
+
+    def __init__(self, timeout=10, site_timeouts=None, headless=True, pool=None, limiter=None):
+        self.limiter = limiter
+        self.timeout = timeout
+        self.site_timeouts = site_timeouts or {}
+        self.headless = headless
+        self.pool = pool
+        self._driver = None
+        self.timeouts = 0
+
+    @property
+    def driver(self):
+        if self._driver is None:
+            self._driver = get_driver(headless=self.headless)
+        return self._driver
+
+    def timeout_for(self, url):
+        host = urlsplit(url).hostname or ''
+        return self.site_timeouts.get(host, self.timeout)
+
+    def fetch(self, url, ready=(), revalidate=False):
+        if self.pool is None:
+            with self.slot(url):
+                return self._render(self.driver, url, ready)
+        # Wait for the host's turn before taking a browser other sites could use
+        with self.slot(url), self.pool.driver() as driver:
+            return self._render(driver, url, ready)
+
+    def _render(self, driver, url, ready):
+        started = time.perf_counter()
+        driver.get(url)
+        if ready:
+            try:
+                WebDriverWait(driver, self.timeout_for(url), poll_frequency=0.1).until(
+                    lambda d: all(d.find_elements(By.CSS_SELECTOR, sel) for sel in ready)
+                )
+            except TimeoutException:
+                self.timeouts += 1
+                print(f"Timed out waiting for {', '.join(ready)} on {url}")
+        self.last_ready_seconds = round(time.perf_counter() - started, 3)
+        return driver.page_source
+
+    def close(self):
+        if self._driver is not None:
+            try:
+                self._driver.quit()
+            finally:
+                self._driver = None
+
+
+class HttpFetcher(Fetcher):
+    """
+    Fetches pages with a keep-alive `requests` session on a shared connection pool.
+    When `fallback` is given, pages missing any of the `required` selectors are
+    fetched again through it.
+
+    With a `cache` (ResponseCache) fresh pages are served from disk and stale
+    ones are revalidated with If-None-Match / If-Modified-Since. `revalidate=True`
+    skips the freshness shortcut, which index pages need to pick up new links.
+    """
+
+    name = 'http'
+
+    def __init__(self, fallback=None, timeout=15, pool_size=10, cache=None, limiter=None):
+        self.limiter = limiter
+        self.fallback = fallback
+        self.timeout = timeout
+        self.cache = cache
+        self.cache_hits = 0
+        self.session = requests.Session()
+        self.session.headers.update({'User-Agent': USER_AGENT})
+        adapter = _shared_adapter(pool_size)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+        self.fallbacks = 0
+
+    def fetch(self, url, ready=(), revalidate=False):
+        started = time.perf_counter()
+        entry = self.cache.get(url) if self.cache is not None else None
+        if entry is not None and not revalidate and self.cache.is_fresh(entry):
+            self.cache_hits += 1
+            self.last_ready_seconds = round(time.perf_counter() - started, 3)
+            return entry.body
+
+        headers = entry.validators() if entry is not None else {}
+        with self.slot(url):
+            response = self.session.get(url, timeout=self.timeout, headers=headers)
+        if response.status_code == 304 and entry is not None:
+            self.cache_hits += 1
+            self.cache.touch(url)
+            body = entry.body
+        else:
+            response.raise_for_status()
+            body = decode_body(response)
+            if self.cache is not None:
+                self.cache.put(url, body, response.headers.get('ETag'), response.headers.get('Last-Modified'))
+        self.last_ready_seconds = round(time.perf_counter() - started, 3)
+        return body
+
+    def get_soup(self, url, required=(), revalidate=False, keep=None):
+        soup = None
+        try:
+            soup = super().get_soup(url, required, revalidate, keep)
+        except requests.RequestException as e:
+            if self.fallback is None:
+                raise
+            print(f"HTTP fetch failed for {url} ({e}), using {self.fallback.name}")
+        if self.fallback is not None and (soup is None or missing_selectors(soup, required)):
+            self.fallbacks += 1
+            html = self.fallback.fetch(url, ready=required)
+            self.last_ready_seconds = self.fallback.last_ready_seconds
+            if html is None:
+                return None
+            if self.cache is not None:
+                # Keep the rendered page so the browser is not needed next time
+                self.cache.put(url, html)
+            soup = parse_html(html, _keep(keep, required))
+        return soup
+
+    def close(self):
+        # The shared adapter outlives this session: unmount it before closing.
+        self.session.adapters.clear()
+        self.session.close()
+        if self.fallback is not None:
+            self.fallback.close()
+
+
+def make_fetcher(backend='http', page_timeout=10, site_timeouts=None, pool=None, cache=None, limiter=None):
+    """
+    Builds a fetcher for `backend`: 'http' (with Selenium fallback) or 'selenium'.
+    `page_timeout` and `site_timeouts` (hostname -> seconds) bound the browser's
+    readiness wait; `pool` is an optional DriverPool to borrow browsers from,
+    `cache` an optional ResponseCache used by the HTTP backend and `limiter` an
+    optional per-domain DomainLimiter.
+    """
+    browser = SeleniumFetcher(timeout=page_timeout, site_timeouts=site_timeouts, pool=pool, limiter=limiter)
+    if backend == 'selenium':
+        return browser
+    if backend == 'http':
+        return HttpFetcher(fallback=browser, cache=cache, limiter=limiter)
+    raise ValueError(f"Unknown fetch backend: {backend}")
+
+
+def get_soup(fetcher, url, required=(), revalidate=False, keep=None):
+    """
+    Fetches and parses `url`, returning None on errors. With `keep` (CSS
+    selectors) only the matching subtrees are parsed into the soup.
+    """
+    try:
+        return fetcher.get_soup(url, required, revalidate, keep)
+    except Exception as e:
+        print(f"Error fetching {url}: {e}")
+        return None
@@ -0,0 +1,135 @@
+"""
+On-disk cache of fetched pages.
+
+Entries are addressed by the SHA-256 of the URL and stored as a body file plus
+a small JSON file holding the validators (ETag / Last-Modified) and fetch time.
+Fresh entries (younger than `ttl`) are served without touching the network;
+stale ones are revalidated with a conditional GET by the HTTP fetcher. When the
+cache grows beyond `max_bytes` the least recently used entries are evicted.
+"""
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+
+
+class CacheEntry:
+    def __init__(self, url, body, etag=None, last_modified=None, fetched_at=0.0):
+        self.url = url
+        self.body = body
+        self.etag = etag
+        self.last_modified = last_modified
+        self.fetched_at = fetched_at
+
+    @property
+    def age(self):
+        return time.time() - self.fetched_at
+
+    def validators(self):
+        headers = {}
+        if self.etag:
+            headers['If-None-Match'] = self.etag
+        if self.last_modified:
+            headers['If-Modified-Since'] = self.last_modified
+        return headers
+
+
+class ResponseCache:
+    def __init__(self, directory, ttl=24 * 3600, max_bytes=200 * 1024 * 1024):
+        self.directory = str(directory)
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._size = None
+        os.makedirs(self.directory, exist_ok=True)
+
+    def _paths(self, url):
+        key = hashlib.sha256(url.encode('utf-8')).hexdigest()
+        base = os.path.join(self.directory, key[:2], key)
+        return base + '.html', base + '.json'
+
+    def _write(self, path, data):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+        os.replace(tmp, path)
+
+    def is_fresh(self, entry):
+        return entry.age < self.ttl
+
+    def get(self, url):
+        body_path, meta_path = self._paths(url)
+        try:
+            with open(meta_path, encoding='utf-8') as f:
+                meta = json.load(f)
+            with open(body_path, encoding='utf-8') as f:
+                body = f.read()
+        except (OSError, ValueError):
+            return None
+        # Bump the access time used for LRU eviction
+        try:
+            os.utime(body_path)
+        except OSError:
+            pass
+        return CacheEntry(url, body, meta.get('etag'), meta.get('last_modified'), meta.get('fetched_at', 0.0))
+
+    def put(self, url, body, etag=None, last_modified=None):
+        body_path, meta_path = self._paths(url)
+        data = body.encode('utf-8')
+        try:
+            previous = os.path.getsize(body_path)
+        except OSError:
+            previous = 0
+        meta = {'url': url, 'etag': etag, 'last_modified': last_modified, 'fetched_at': time.time()}
+        self._write(body_path, data)
+        self._write(meta_path, json.dumps(meta).encode('utf-8'))
+        with self._lock:
+            if self._size is None:
+                self._size = self._scan_size()
+            else:
+                self._size += len(data) - previous
+            over = self._size > self.max_bytes
+        if over:
+            self.evict()
+
+    def touch(self, url):
+        """Marks a revalidated (304) entry as freshly fetched."""
+        entry = self.get(url)
+        if entry is not None:
+            self.put(url, entry.body, entry.etag, entry.last_modified)
+        return entry
+
+    def _entries(self):
+        for root, _, files in os.walk(self.directory):
+            for name in files:
+                if name.endswith('.html'):
+                    path = os.path.join(root, name)
+                    try:
+                        st = os.stat(path)
+                    except OSError:
+                        continue
+                    yield path, st.st_size, st.st_mtime
+
+    def _scan_size(self):
+        return sum(size for _, size, _ in self._entries())
+
+    def evict(self):
+        """Removes least recently used entries until the cache fits in `max_bytes`."""
+        with self._lock:
+            entries = sorted(self._entries(), key=lambda e: e[2])
+            total = sum(size for _, size, _ in entries)
+            # Leave some headroom so we do not evict again on the next put
+            target = self.max_bytes * 0.9
+            for path, size, _ in entries:
+                if total <= target:
+                    break
+                for p in (path, path[:-len('.html')] + '.json'):
+                    try:
+                        os.remove(p)
+                    except OSError:
+                        pass
+                total -= size
+            self._size = total
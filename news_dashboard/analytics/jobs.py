@@ -0,0 +1,108 @@
+"""
+Background execution of dashboard analyses.
+
+The dashboard view submits a job and returns immediately; a process-local
+thread pool (NEWS_JOB_WORKERS wide) runs the scrape/NLP/plot pipeline and keeps
+the job's counters and result in the AnalysisJob table so any web worker can
+report progress. Jobs left unfinished for NEWS_JOB_TIMEOUT_SECONDS (e.g. because
+the process running them restarted) are reported as failed.
+"""
+import threading
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import close_old_connections
+from django.utils import timezone
+
+from .models import AnalysisJob
+from .utils import scrape_and_process, generate_charts
+
+ARTICLE_COLUMNS = ['headline', 'url', 'sentiment_label', 'sentiment_score', 'Mapped_Category']
+STALE_ERROR = 'The analysis did not finish, the server may have restarted. Please try again.'
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def get_executor():
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=getattr(settings, 'NEWS_JOB_WORKERS', 2),
+                thread_name_prefix='analysis-job',
+            )
+        return _executor
+
+
+def build_result(df, plots, chart_data=None):
+    """The template context shared by the synchronous and background paths."""
+    return {
+        'articles': df[ARTICLE_COLUMNS].to_dict('records'),
+        'plots': plots,
+        'chart_data': chart_data,
+        'total_articles': len(df),
+    }
+
+
+def submit_job(url):
+    job = AnalysisJob.objects.create(url=url)
+    get_executor().submit(run_job, job.pk)
+    return job
+
+
+def fail_if_stale(job):
+    """Marks `job` failed when it has been queued or running for longer than NEWS_JOB_TIMEOUT_SECONDS."""
+    if job.is_finished:
+        return job
+    timeout = getattr(settings, 'NEWS_JOB_TIMEOUT_SECONDS', 1800)
+    since = job.started_at or job.created_at
+    if since >= timezone.now() - timedelta(seconds=timeout):
+        return job
+    AnalysisJob.objects.filter(pk=job.pk, status=job.status).update(
+        status=AnalysisJob.FAILED,
+        error=STALE_ERROR,
+        finished_at=timezone.now(),
+    )
+    job.refresh_from_db()
+    return job
+
+
+def run_job(job_id):
+    close_old_connections()
+    try:
+        job = AnalysisJob.objects.get(pk=job_id)
+        # A job already given up on as stale is not started any more
+        if not AnalysisJob.objects.filter(pk=job_id, status=AnalysisJob.QUEUED).update(
+                status=AnalysisJob.RUNNING, started_at=timezone.now()):
+            return
+
+        def progress(**counts):
+            AnalysisJob.objects.filter(pk=job_id).update(**counts)
+
+        df = scrape_and_process(job.url, progress=progress)
+        if df.empty:
+            AnalysisJob.objects.filter(pk=job_id).update(
+                status=AnalysisJob.FAILED,
+                error='No articles found or scraping failed. Try another URL.',
+                finished_at=timezone.now(),
+            )
+            return
+
+        plots, chart_data, df = generate_charts(df, progress=progress)
+        AnalysisJob.objects.filter(pk=job_id).update(
+            status=AnalysisJob.DONE,
+            result=build_result(df, plots, chart_data),
+            finished_at=timezone.now(),
+        )
+    except Exception as e:
+        traceback.print_exc()
+        AnalysisJob.objects.filter(pk=job_id).update(
+            status=AnalysisJob.FAILED,
+            error=f"An error occurred: {str(e)}",
+            finished_at=timezone.now(),
+        )
+    finally:
+        close_old_connections()
@@ -0,0 +1,32 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Article',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('url', models.URLField(max_length=1000, unique=True)),
+                ('content_hash', models.CharField(db_index=True, max_length=64)),
+                ('headline', models.TextField()),
+                ('category', models.CharField(default='General', max_length=100)),
+                ('date', models.CharField(blank=True, max_length=64)),
+                ('content', models.TextField(blank=True)),
+                ('sentiment_score', models.FloatField(default=0.0)),
+                ('sentiment_label', models.CharField(default='Neutral', max_length=16)),
+                ('mapped_category', models.CharField(default='General', max_length=32)),
+                ('people', models.JSONField(default=list)),
+                ('orgs', models.JSONField(default=list)),
+                ('locations', models.JSONField(default=list)),
+                ('first_seen', models.DateTimeField(auto_now_add=True)),
+                ('checked_at', models.DateTimeField(db_index=True)),
+            ],
+        ),
+    ]
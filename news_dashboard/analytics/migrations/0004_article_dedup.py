@@ -0,0 +1,57 @@
+import django.db.models.deletion
+from django.db import migrations, models
+
+from analytics.dedup import bands_of, simhash, to_signed
+
+
+def fingerprint_articles(apps, schema_editor):
+    Article = apps.get_model('analytics', 'Article')
+    for article in Article.objects.only('pk', 'content').iterator():
+        fingerprint = simhash(article.content)
+        if fingerprint is None:
+            continue
+        fields = {'simhash': to_signed(fingerprint)}
+        for i, band in enumerate(bands_of(fingerprint)):
+            fields[f'simhash_band{i}'] = band
+        Article.objects.filter(pk=article.pk).update(**fields)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('analytics', '0003_analysisjob_seeds'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='article',
+            name='simhash',
+            field=models.BigIntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='article',
+            name='simhash_band0',
+            field=models.IntegerField(blank=True, db_index=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='article',
+            name='simhash_band1',
+            field=models.IntegerField(blank=True, db_index=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='article',
+            name='simhash_band2',
+            field=models.IntegerField(blank=True, db_index=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='article',
+            name='simhash_band3',
+            field=models.IntegerField(blank=True, db_index=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='article',
+            name='duplicate_of',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='duplicates', to='analytics.article'),
+        ),
+        migrations.RunPython(fingerprint_articles, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,84 @@
+from datetime import datetime
+
+from django.db import migrations, models
+
+FTS_TABLE = 'analytics_article_fts'
+
+# People, organisations and locations as one space-separated text column
+ENTITIES_SQL = (
+    "(SELECT group_concat(value, ' ') FROM ("
+    "SELECT value FROM json_each({row}.people) UNION ALL "
+    "SELECT value FROM json_each({row}.orgs) UNION ALL "
+    "SELECT value FROM json_each({row}.locations)))"
+)
+
+CREATE_SQL = [
+    # Contentless: the text stays in analytics_article, the index only holds postings
+    f"CREATE VIRTUAL TABLE {FTS_TABLE} USING fts5("
+    "headline, content, entities, content='', tokenize='porter unicode61 remove_diacritics 2')",
+    f"INSERT INTO {FTS_TABLE}(rowid, headline, content, entities) "
+    f"SELECT id, headline, content, {ENTITIES_SQL.format(row='analytics_article')} "
+    "FROM analytics_article WHERE duplicate_of_id IS NULL",
+    f"CREATE TRIGGER {FTS_TABLE}_ai AFTER INSERT ON analytics_article "
+    "WHEN new.duplicate_of_id IS NULL BEGIN "
+    f"INSERT INTO {FTS_TABLE}(rowid, headline, content, entities) "
+    f"VALUES (new.id, new.headline, new.content, {ENTITIES_SQL.format(row='new')}); END",
+    f"CREATE TRIGGER {FTS_TABLE}_ad AFTER DELETE ON analytics_article "
+    "WHEN old.duplicate_of_id IS NULL BEGIN "
+    f"INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, headline, content, entities) "
+    f"VALUES ('delete', old.id, old.headline, old.content, {ENTITIES_SQL.format(row='old')}); END",
+    # One trigger so the old entry is always removed before the new one is added
+    # (triggers on the same event fire in reverse creation order)
+    f"CREATE TRIGGER {FTS_TABLE}_au AFTER UPDATE OF headline, content, people, orgs, locations, duplicate_of_id "
+    "ON analytics_article BEGIN "
+    f"INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, headline, content, entities) "
+    f"SELECT 'delete', old.id, old.headline, old.content, {ENTITIES_SQL.format(row='old')} "
+    "WHERE old.duplicate_of_id IS NULL; "
+    f"INSERT INTO {FTS_TABLE}(rowid, headline, content, entities) "
+    f"SELECT new.id, new.headline, new.content, {ENTITIES_SQL.format(row='new')} "
+    "WHERE new.duplicate_of_id IS NULL; END",
+]
+
+DROP_SQL = [
+    f"DROP TRIGGER IF EXISTS {FTS_TABLE}_ai",
+    f"DROP TRIGGER IF EXISTS {FTS_TABLE}_ad",
+    f"DROP TRIGGER IF EXISTS {FTS_TABLE}_au",
+    f"DROP TABLE IF EXISTS {FTS_TABLE}",
+]
+
+
+def parse_published(apps, schema_editor):
+    Article = apps.get_model('analytics', 'Article')
+    for article in Article.objects.only('pk', 'date').iterator():
+        try:
+            published = datetime.fromisoformat(article.date).date()
+        except ValueError:
+            continue
+        Article.objects.filter(pk=article.pk).update(published=published)
+
+
+def run_sql(statements):
+    # FTS5 is SQLite-only; other databases fall back to plain lookups (see search.py)
+    def run(apps, schema_editor):
+        if schema_editor.connection.vendor != 'sqlite':
+            return
+        for statement in statements:
+            schema_editor.execute(statement)
+    return run
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('analytics', '0004_article_dedup'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='article',
+            name='published',
+            field=models.DateField(blank=True, db_index=True, null=True),
+        ),
+        migrations.RunPython(parse_published, migrations.RunPython.noop),
+        migrations.RunPython(run_sql(CREATE_SQL), run_sql(DROP_SQL)),
+    ]
@@ -1,3 +1,79 @@
+import uuid
+
 from django.db import models
 
-# Create your models here.
+
+class Article(models.Model):
+    """
+    An analysed article, keyed by (canonical) URL. `content_hash` lets the
+    pipeline tell whether a refetched page changed and needs to go through NLP
+    again; `simhash` finds the same story published under another URL. On
+    SQLite, originals are also kept in a full-text index (analytics_article_fts,
+    maintained by triggers; see search.py).
+    """
+    url = models.URLField(max_length=1000, unique=True)
+    content_hash = models.CharField(max_length=64, db_index=True)
+    headline = models.TextField()
+    category = models.CharField(max_length=100, default='General')
+    date = models.CharField(max_length=64, blank=True)
+    # `date` parsed, for filtering; null when the page's date could not be read
+    published = models.DateField(null=True, blank=True, db_index=True)
+    content = models.TextField(blank=True)
+    sentiment_score = models.FloatField(default=0.0)
+    sentiment_label = models.CharField(max_length=16, default='Neutral')
+    mapped_category = models.CharField(max_length=32, default='General')
+    people = models.JSONField(default=list)
+    orgs = models.JSONField(default=list)
+    locations = models.JSONField(default=list)
+    first_seen = models.DateTimeField(auto_now_add=True)
+    checked_at = models.DateTimeField(db_index=True)
+    # SimHash of the content (as a signed 64-bit value) and its four 16-bit
+    # bands; near-duplicates share at least one band (see dedup.py).
+    simhash = models.BigIntegerField(null=True, blank=True)
+    simhash_band0 = models.IntegerField(null=True, blank=True, db_index=True)
+    simhash_band1 = models.IntegerField(null=True, blank=True, db_index=True)
+    simhash_band2 = models.IntegerField(null=True, blank=True, db_index=True)
+    simhash_band3 = models.IntegerField(null=True, blank=True, db_index=True)
+    # Set when this URL carries the same story as another stored article; it
+    # then reuses that article's analysis instead of going through NLP.
+    duplicate_of = models.ForeignKey(
+        'self', null=True, blank=True, on_delete=models.SET_NULL, related_name='duplicates',
+    )
+
+    def __str__(self):
+        return self.headline
+
+
+class AnalysisJob(models.Model):
+    """A dashboard analysis run in the background; the view polls its counters."""
+    QUEUED = 'queued'
+    RUNNING = 'running'
+    DONE = 'done'
+    FAILED = 'failed'
+    STATUS_CHOICES = [
+        (QUEUED, 'Queued'),
+        (RUNNING, 'Running'),
+        (DONE, 'Done'),
+        (FAILED, 'Failed'),
+    ]
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    # One or more seed URLs separated by whitespace
+    url = models.TextField()
+    status = models.CharField(max_length=16, choices=STATUS_CHOICES, default=QUEUED, db_index=True)
+    total = models.PositiveIntegerField(default=0)
+    fetched = models.PositiveIntegerField(default=0)
+    analysed = models.PositiveIntegerField(default=0)
+    plotted = models.PositiveIntegerField(default=0)
+    error = models.TextField(blank=True)
+    result = models.JSONField(null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    @property
+    def is_finished(self):
+        return self.status in (self.DONE, self.FAILED)
+
+    def __str__(self):
+        return f"{self.url} ({self.status})"
@@ -0,0 +1,40 @@
+"""
+Lazily loaded spaCy model.
+
+Loading `en_core_web_sm` takes seconds and a few hundred MB, so nothing loads it
+at import time: the first caller of `get_nlp` does, behind a lock, and every
+later caller gets the same instance. `warm_up` lets a server process pay the
+cost at startup instead of on its first request (see NEWS_NLP_WARMUP).
+"""
+import threading
+import time
+
+MODEL_NAME = "en_core_web_sm"
+
+_nlp = None
+_lock = threading.Lock()
+
+
+def get_nlp():
+    global _nlp
+    if _nlp is None:
+        with _lock:
+            if _nlp is None:
+                import spacy
+                try:
+                    _nlp = spacy.load(MODEL_NAME)
+                except OSError:
+                    from spacy.cli import download
+                    download(MODEL_NAME)
+                    _nlp = spacy.load(MODEL_NAME)
+    return _nlp
+
+
+def is_loaded():
+    return _nlp is not None
+
+
+def warm_up():
+    started = time.perf_counter()
+    get_nlp()
+    print(f"Loaded spaCy model {MODEL_NAME} in {time.perf_counter() - started:.1f}s")
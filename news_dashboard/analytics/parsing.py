@@ -0,0 +1,91 @@
+"""
+Fast HTML parsing.
+
+Pages are parsed with lxml's C parser and, when the caller says which CSS
+selectors it will read (`keep`), only the matching subtrees are handed over to
+BeautifulSoup: each match is copied together with bare copies of its ancestors
+(tag and attributes only), so descendant selectors such as `div.body p` still
+match while ads, scripts and navigation never become BeautifulSoup nodes.
+Selectors are translated to XPath with cssselect once and cached. Without
+lxml everything falls back to a full `html.parser` parse.
+"""
+import copy
+import threading
+from functools import lru_cache
+
+from bs4 import BeautifulSoup
+
+try:
+    from lxml import etree, html as lxml_html
+    from lxml.cssselect import CSSSelector
+except ImportError:  # pragma: no cover - optional speed-up
+    etree = None
+
+_local = threading.local()
+
+
+def has_lxml():
+    return etree is not None
+
+
+@lru_cache(maxsize=256)
+def compile_selector(selector):
+    return CSSSelector(selector, translator='html')
+
+
+def _parser():
+    # lxml parsers must not be shared between threads
+    parser = getattr(_local, 'parser', None)
+    if parser is None:
+        parser = _local.parser = lxml_html.HTMLParser(encoding='utf-8', remove_comments=True)
+    return parser
+
+
+def _prune(root, matches):
+    """Copies `matches` with bare copies of their ancestors, in document order."""
+    needed = set()
+    for el in matches:
+        parent = el.getparent()
+        while parent is not None and parent not in needed:
+            needed.add(parent)
+            parent = parent.getparent()
+
+    def visit(el):
+        if el in matches:
+            clone = copy.deepcopy(el)
+            clone.tail = None
+            return clone
+        if el not in needed:
+            return None
+        shell = etree.Element(el.tag, attrib=dict(el.attrib))
+        for child in el:
+            if isinstance(child.tag, str):
+                kept = visit(child)
+                if kept is not None:
+                    shell.append(kept)
+        return shell
+
+    return visit(root)
+
+
+def parse_html(html, keep=None):
+    """
+    Parses `html` into BeautifulSoup. With `keep` (CSS selectors), the soup only
+    holds the elements matching them, their descendants and their ancestors.
+    """
+    if not has_lxml():
+        return BeautifulSoup(html, 'html.parser')
+    data = html.encode('utf-8') if isinstance(html, str) else html
+    try:
+        root = lxml_html.document_fromstring(data, parser=_parser())
+    except (etree.ParserError, ValueError):
+        return BeautifulSoup(html, 'html.parser')
+    if keep:
+        matches = set()
+        for selector in keep:
+            matches.update(compile_selector(selector)(root))
+        pruned = _prune(root, matches) if matches else None
+        if pruned is None:
+            pruned = etree.Element('html')
+        root = pruned
+    return BeautifulSoup(etree.tostring(root, encoding='unicode', method='html'), 'lxml')
@@ -0,0 +1,98 @@
+"""
+Search over the stored articles.
+
+On SQLite the originals (not their duplicates) are indexed in an FTS5 table,
+`analytics_article_fts`, over the headline, the content and the people,
+organisations and locations found in it. The table is contentless and kept in
+step with analytics_article by triggers (migration 0005), so every save updates
+the index and nothing has to be rebuilt. Matches are ranked with bm25, weighing
+headline and entity hits above body hits. Other databases fall back to
+case-insensitive substring lookups.
+"""
+import re
+import threading
+
+from django.db import connection
+from django.db.models import Q
+
+from .models import Article
+
+FTS_TABLE = 'analytics_article_fts'
+# bm25 weights of the headline, content and entities columns
+WEIGHTS = (5.0, 1.0, 3.0)
+SENTIMENTS = ('Positive', 'Neutral', 'Negative')
+_TERM_RE = re.compile(r'\w+')
+
+_fts_available = None
+_fts_lock = threading.Lock()
+
+
+def fts_available():
+    global _fts_available
+    if _fts_available is None:
+        with _fts_lock:
+            if _fts_available is None:
+                _fts_available = (
+                    connection.vendor == 'sqlite'
+                    and FTS_TABLE in connection.introspection.table_names()
+                )
+    return _fts_available
+
+
+def match_query(text):
+    """
+    FTS5 query matching every word of `text`. Words are quoted so user input
+    never reaches the query syntax; the last one also matches as a prefix.
+    """
+    terms = _TERM_RE.findall(text or '')
+    if not terms:
+        return None
+    quoted = [f'"{term}"' for term in terms]
+    if not text[-1].isspace():
+        quoted[-1] += '*'
+    return " ".join(quoted)
+
+
+def categories():
+    return list(
+        Article.objects.filter(duplicate_of__isnull=True)
+        .order_by('mapped_category').values_list('mapped_category', flat=True).distinct()
+    )
+
+
+def search_articles(query='', category=None, sentiment=None, date_from=None, date_to=None, limit=50):
+    """
+    Returns up to `limit` original articles matching `query` (best first) and
+    the filters; without a query, the latest articles matching the filters.
+    """
+    articles = Article.objects.filter(duplicate_of__isnull=True)
+    if category:
+        articles = articles.filter(mapped_category=category)
+    if sentiment:
+        articles = articles.filter(sentiment_label=sentiment)
+    if date_from:
+        articles = articles.filter(published__gte=date_from)
+    if date_to:
+        articles = articles.filter(published__lte=date_to)
+
+    match = match_query(query)
+    if match is None:
+        return list(articles.order_by('-published', '-checked_at')[:limit])
+
+    if not fts_available():
+        text = query.strip()
+        return list(articles.filter(
+            Q(headline__icontains=text) | Q(content__icontains=text)
+            | Q(people__icontains=text) | Q(orgs__icontains=text) | Q(locations__icontains=text)
+        ).order_by('-published', '-checked_at')[:limit])
+
+    # The FTS match drives the query; the filters only check its hits
+    ids_sql, params = articles.values('id').query.sql_with_params()
+    table = Article._meta.db_table
+    weights = ", ".join(str(w) for w in WEIGHTS)
+    sql = (
+        f"SELECT {table}.* FROM {FTS_TABLE} JOIN {table} ON {table}.id = {FTS_TABLE}.rowid "
+        f"WHERE {FTS_TABLE} MATCH %s AND {table}.id IN ({ids_sql}) "
+        f"ORDER BY bm25({FTS_TABLE}, {weights}) LIMIT %s"
+    )
+    return list(Article.objects.raw(sql, [match, *params, limit]))
@@ -0,0 +1,163 @@
+"""
+Batch sentiment scoring over text chunks.
+
+Every article is split into overlapping chunks (as offsets, see chunking.py),
+every chunk of every article is scored in one pass, and the chunk polarities
+are averaged back per article with a NumPy group-by. Two engines are available:
+
+- 'lexicon' (default): tokenises all chunks at once and looks the tokens up in
+  TextBlob's pattern lexicon, loaded once per process. Negations ("not good")
+  and intensifiers ("very good") are applied the way the pattern analyser does.
+- 'textblob': runs TextBlob on each chunk, for exact parity with the old
+  per-article scorer.
+"""
+import re
+import threading
+
+import numpy as np
+
+from .chunking import iter_chunk_spans
+
+POSITIVE_THRESHOLD = 0.05
+NEGATIVE_THRESHOLD = -0.05
+
+_TOKEN_RE = re.compile(r"[a-z]+(?:'[a-z]+)*")
+
+_lexicon = None
+_lexicon_lock = threading.Lock()
+
+
+class Lexicon:
+    """Word polarities and modifier intensities taken from TextBlob's pattern lexicon."""
+
+    def __init__(self, polarity, intensity, negations):
+        self.polarity = polarity
+        self.intensity = intensity
+        self.negations = negations
+
+    @classmethod
+    def from_textblob(cls):
+        from textblob.en import sentiment as pattern
+
+        polarity = {}
+        intensity = {}
+        for word, senses in pattern.items():
+            # The None key holds the average over all parts of speech
+            p, _, i = senses.get(None) or next(iter(senses.values()))
+            polarity[word] = p
+            if any(pos in senses for pos in pattern.modifiers):
+                intensity[word] = i
+        return cls(polarity, intensity, frozenset(pattern.negations))
+
+    def is_negation(self, token):
+        return token in self.negations or token.endswith("n't")
+
+
+def get_lexicon():
+    global _lexicon
+    if _lexicon is None:
+        with _lexicon_lock:
+            if _lexicon is None:
+                _lexicon = Lexicon.from_textblob()
+    return _lexicon
+
+
+def _group_mean(values, groups, n_groups, weights=None):
+    if weights is None:
+        weights = np.ones(len(values))
+    totals = np.bincount(groups, weights=values * weights, minlength=n_groups)
+    counts = np.bincount(groups, weights=weights, minlength=n_groups)
+    return np.divide(totals, counts, out=np.zeros(n_groups), where=counts > 0)
+
+
+def _score_chunks_lexicon(texts, spans):
+    lexicon = get_lexicon()
+    # Lowercase each article once and scan the chunks in place
+    lowered = [text.lower() for text in texts]
+    tokens = []
+    chunk_ids = []
+    for cid, (aid, start, end) in enumerate(spans):
+        found = _TOKEN_RE.findall(lowered[aid], start, end)
+        tokens.extend(found)
+        chunk_ids.extend([cid] * len(found))
+    if not tokens:
+        return np.zeros(len(spans))
+
+    # Look every distinct token up once, then broadcast back
+    vocab, inverse = np.unique(np.array(tokens), return_inverse=True)
+    vocab_pol = np.array([lexicon.polarity.get(w, np.nan) for w in vocab])
+    vocab_int = np.array([lexicon.intensity.get(w, 0.0) for w in vocab])
+    vocab_neg = np.array([lexicon.is_negation(w) for w in vocab])
+
+    chunk_ids = np.asarray(chunk_ids)
+    pol = vocab_pol[inverse]
+    known = ~np.isnan(pol)
+    pol = np.where(known, pol, 0.0)
+    intensity = vocab_int[inverse]
+    negation = vocab_neg[inverse]
+
+    # Look at the previous token of the same chunk
+    same_chunk = np.zeros(len(tokens), dtype=bool)
+    same_chunk[1:] = chunk_ids[1:] == chunk_ids[:-1]
+    prev_intensity = np.zeros(len(tokens))
+    prev_intensity[1:] = intensity[:-1]
+    prev_negation = np.zeros(len(tokens), dtype=bool)
+    prev_negation[1:] = negation[:-1]
+
+    # "very good": the modifier scales the word and is merged into its assessment
+    modified = known & same_chunk & (prev_intensity > 0)
+    pol = np.where(modified, np.clip(pol * prev_intensity, -1.0, 1.0), pol)
+    merged = np.zeros(len(tokens), dtype=bool)
+    merged[:-1] = modified[1:]
+    # "not good": negation flips and halves the polarity
+    negated = known & same_chunk & prev_negation
+    pol = np.where(negated, np.clip(pol * -0.5, -1.0, 1.0), pol)
+
+    assessed = known & ~merged
+    return _group_mean(pol, chunk_ids, len(spans), weights=assessed.astype(float))
+
+
+def _score_chunks_textblob(texts, spans):
+    from textblob import TextBlob
+    return np.array([TextBlob(texts[aid][start:end]).sentiment.polarity for aid, start, end in spans], dtype=float)
+
+
+def score_texts(texts, engine='lexicon', chunk_size=500, overlap=50, snap=None):
+    """
+    Scores many texts at once. Returns an array of mean chunk polarities and
+    an array of 'Positive' / 'Neutral' / 'Negative' labels, aligned with `texts`.
+    `snap` is passed to the chunker ('word' or 'sentence' avoids mid-word cuts).
+    """
+    texts = ["" if t is None or t != t else str(t) for t in texts]
+    spans = [
+        (aid, start, end)
+        for aid, text in enumerate(texts)
+        for start, end in iter_chunk_spans(text, chunk_size, overlap, snap)
+    ]
+
+    if not spans:
+        scores = np.zeros(len(texts))
+    else:
+        if engine == 'lexicon':
+            chunk_scores = _score_chunks_lexicon(texts, spans)
+        elif engine == 'textblob':
+            chunk_scores = _score_chunks_textblob(texts, spans)
+        else:
+            raise ValueError(f"Unknown sentiment engine: {engine}")
+        article_ids = np.fromiter((aid for aid, _, _ in spans), dtype=np.int64, count=len(spans))
+        scores = _group_mean(chunk_scores, article_ids, len(texts))
+
+    labels = np.select(
+        [scores > POSITIVE_THRESHOLD, scores < NEGATIVE_THRESHOLD],
+        ['Positive', 'Negative'],
+        default='Neutral',
+    )
+    return scores, labels
+
+
+def analyze_sentiment_with_chunks(text, engine='lexicon', snap=None):
+    """
+    Analyzes sentiment by averaging the polarity of text chunks.
+    """
+    scores, labels = score_texts([text], engine=engine, snap=snap)
+    return float(scores[0]), str(labels[0])
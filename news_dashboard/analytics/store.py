@@ -0,0 +1,152 @@
+"""
+Persistence of analysed articles so repeat runs only process the delta.
+"""
+import hashlib
+from datetime import datetime, timedelta
+
+import pandas as pd
+from django.db.models import Q
+from django.utils import timezone
+
+from . import dedup
+from .models import Article
+
+# DataFrame column -> Article field for the analysed columns
+ANALYSIS_FIELDS = {
+    'sentiment_score': 'sentiment_score',
+    'sentiment_label': 'sentiment_label',
+    'Mapped_Category': 'mapped_category',
+    'People': 'people',
+    'Orgs': 'orgs',
+    'Locations': 'locations',
+}
+
+
+def content_hash(headline, content):
+    return hashlib.sha256(f"{headline}\n{content}".encode('utf-8')).hexdigest()
+
+
+def published_date(value):
+    """The calendar date of an article's `date` string, or None when it is not ISO 8601."""
+    try:
+        return datetime.fromisoformat(str(value)).date()
+    except ValueError:
+        return None
+
+
+def stored_articles(urls):
+    return {a.url: a for a in Article.objects.filter(url__in=list(urls)).select_related('duplicate_of')}
+
+
+def canonical(article):
+    """The article whose analysis `article` uses: its original when it is a duplicate."""
+    return article.duplicate_of or article
+
+
+def fingerprint_fields(fingerprint):
+    fields = {'simhash': None if fingerprint is None else dedup.to_signed(fingerprint)}
+    bands = dedup.bands_of(fingerprint) if fingerprint is not None else [None] * dedup.BANDS
+    for i, band in enumerate(bands):
+        fields[f'simhash_band{i}'] = band
+    return fields
+
+
+def find_duplicate(url, digest, fingerprint):
+    """
+    Returns the stored original of the story in an article (other than `url`)
+    with the same content hash or a SimHash within dedup.MAX_DISTANCE bits.
+    """
+    others = Article.objects.exclude(url=url).filter(duplicate_of__isnull=True)
+    exact = others.filter(content_hash=digest).first()
+    if exact is not None or fingerprint is None:
+        return exact
+    match_any_band = Q()
+    for i, band in enumerate(dedup.bands_of(fingerprint)):
+        match_any_band |= Q(**{f'simhash_band{i}': band})
+    best = None
+    for candidate in others.filter(match_any_band).exclude(simhash=None):
+        distance = dedup.hamming(fingerprint, dedup.to_unsigned(candidate.simhash))
+        if distance <= dedup.MAX_DISTANCE and (best is None or distance < best[0]):
+            best = (distance, candidate)
+    return best[1] if best else None
+
+
+def save_duplicate(article, original, fingerprint=None):
+    """Records `article` (a fetched article dict) as a copy of `original`, reusing its analysis."""
+    values = {
+        'content_hash': article['content_hash'],
+        'headline': article['headline'],
+        'category': article['category'],
+        'date': str(article['date']),
+        'published': published_date(article['date']),
+        # The text lives on the original
+        'content': '',
+        'checked_at': timezone.now(),
+        'duplicate_of': original,
+    }
+    for field in ANALYSIS_FIELDS.values():
+        values[field] = getattr(original, field)
+    values.update(fingerprint_fields(fingerprint))
+    Article.objects.update_or_create(url=article['url'], defaults=values)
+
+
+def corpus():
+    """(headline, content) of every stored article."""
+    return list(Article.objects.filter(duplicate_of__isnull=True).values_list('headline', 'content'))
+
+
+def is_recent(article, max_age):
+    return article.checked_at >= timezone.now() - timedelta(seconds=max_age)
+
+
+def mark_checked(articles):
+    now = timezone.now()
+    Article.objects.filter(pk__in=[a.pk for a in articles]).update(checked_at=now)
+    for a in articles:
+        a.checked_at = now
+
+
+def to_row(article):
+    row = {
+        'url': article.url,
+        'headline': article.headline,
+        'category': article.category,
+        'date': article.date,
+        'content': article.content,
+    }
+    for column, field in ANALYSIS_FIELDS.items():
+        row[column] = getattr(article, field)
+    row['full_text'] = article.headline + ". " + article.content
+    return row
+
+
+def save_articles(df, fingerprints=None):
+    """
+    Inserts or updates the analysed rows of `df`. `fingerprints` maps URLs to
+    their already computed SimHash; the others are computed here.
+    """
+    now = timezone.now()
+    for row in df.to_dict('records'):
+        values = {
+            'content_hash': row.get('content_hash') or content_hash(row['headline'], row['content']),
+            'headline': row['headline'],
+            'category': row['category'],
+            'date': str(row['date']),
+            'published': published_date(row['date']),
+            'content': row['content'],
+            'checked_at': now,
+        }
+        for column, field in ANALYSIS_FIELDS.items():
+            value = row[column]
+            values[field] = list(value) if isinstance(value, (list, tuple)) else value
+        if fingerprints is not None and row['url'] in fingerprints:
+            fingerprint = fingerprints[row['url']]
+        else:
+            fingerprint = dedup.simhash(row['content'])
+        values.update(fingerprint_fields(fingerprint))
+        values['duplicate_of'] = None
+        Article.objects.update_or_create(url=row['url'], defaults=values)
+
+
+def rows_frame(articles):
+    return pd.DataFrame([to_row(a) for a in articles])
@@ -0,0 +1,140 @@
+"""
+Server-sent events for the live dashboard.
+
+`iter_events` runs the pipeline in small batches and turns every analysed
+article into an `article` event as soon as its batch is done, with `summary`
+events (category and sentiment counts) at most every NEWS_STREAM_SUMMARY_SECONDS
+and the rendered `plots` (or the `charts` data in client chart mode) at the end.
+`stream_events` drives it on a process-local thread pool (NEWS_STREAM_WORKERS
+wide) so an ASGI server can stream it without blocking the event loop, and
+stops it when the client leaves.
+"""
+import asyncio
+import json
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor, TimeoutError
+
+import pandas as pd
+from django.conf import settings
+from django.db import close_old_connections
+
+from .jobs import ARTICLE_COLUMNS
+from .utils import discover_links, iter_process_links, generate_charts
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def get_executor():
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=getattr(settings, 'NEWS_STREAM_WORKERS', 2),
+                thread_name_prefix='dashboard-stream',
+            )
+        return _executor
+
+
+def sse(event, data):
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+def _summary(categories, sentiments, total):
+    return sse('summary', {
+        'total': total,
+        'categories': dict(categories.most_common()),
+        'sentiment': dict(sentiments),
+    })
+
+
+def iter_events(url):
+    batch_size = getattr(settings, 'NEWS_STREAM_BATCH_SIZE', 5)
+    interval = getattr(settings, 'NEWS_STREAM_SUMMARY_SECONDS', 2)
+    try:
+        yield sse('status', {'stage': 'discovering'})
+        links = discover_links(url)
+        yield sse('status', {'stage': 'processing', 'links': len(links)})
+
+        frames = []
+        categories = Counter()
+        sentiments = Counter()
+        last_summary = 0.0
+        for frame in iter_process_links(links, batch_size=batch_size):
+            if frame.empty:
+                continue
+            frames.append(frame)
+            for row in frame[ARTICLE_COLUMNS].to_dict('records'):
+                yield sse('article', row)
+            categories.update(frame['Mapped_Category'])
+            sentiments.update(frame['sentiment_label'])
+            if time.monotonic() - last_summary >= interval:
+                last_summary = time.monotonic()
+                yield _summary(categories, sentiments, sum(len(f) for f in frames))
+
+        if not frames:
+            yield sse('failed', {'message': 'No articles found or scraping failed. Try another URL.'})
+            return
+        df = pd.concat(frames, ignore_index=True)
+        yield _summary(categories, sentiments, len(df))
+
+        yield sse('status', {'stage': 'plotting'})
+        plots, chart_data, df = generate_charts(df)
+        if chart_data is not None:
+            yield sse('charts', chart_data)
+        else:
+            yield sse('plots', plots)
+        yield sse('done', {'total': len(df)})
+    except Exception as e:
+        yield sse('failed', {'message': f"An error occurred: {str(e)}"})
+
+
+async def stream_events(url):
+    """
+    Async wrapper around `iter_events` that runs the pipeline on the stream
+    executor. The pipeline waits while NEWS_STREAM_QUEUE_SIZE events are
+    undelivered and stops at its next batch once the generator is closed
+    (the client disconnected).
+    """
+    loop = asyncio.get_running_loop()
+    queue = asyncio.Queue(maxsize=getattr(settings, 'NEWS_STREAM_QUEUE_SIZE', 50))
+    cancelled = threading.Event()
+    finished = object()
+
+    def put(item):
+        # Wait for room in the queue, giving up once the client is gone
+        future = asyncio.run_coroutine_threadsafe(queue.put(item), loop)
+        while not cancelled.is_set():
+            try:
+                future.result(timeout=0.5)
+                return True
+            except TimeoutError:
+                continue
+        future.cancel()
+        return False
+
+    def worker():
+        events = iter_events(url)
+        try:
+            for event in events:
+                if cancelled.is_set() or not put(event):
+                    break
+        finally:
+            events.close()
+            close_old_connections()
+            if not cancelled.is_set():
+                put(finished)
+
+    task = get_executor().submit(worker)
+    try:
+        while True:
+            event = await queue.get()
+            if event is finished:
+                break
+            yield event
+    finally:
+        cancelled.set()
+        # Drops the stream if it is still waiting for a worker
+        task.cancel()
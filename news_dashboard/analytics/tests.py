@@ -1,3 +1,45 @@
-from django.test import TestCase
+from django.test import SimpleTestCase, TestCase
+from django.utils import timezone
 
-# Create your tests here.
+from .dedup import BITS, hamming, simhash, to_signed, to_unsigned
+from .models import Article
+from .search import fts_available, search_articles
+
+
+class SimHashTests(SimpleTestCase):
+    TEXT = " ".join(f"word{i} story{i % 7} about{i % 3}" for i in range(40))
+
+    def test_fingerprint_is_unsigned_64_bit(self):
+        fingerprint = simhash(self.TEXT)
+        self.assertGreaterEqual(fingerprint, 0)
+        self.assertLess(fingerprint, 1 << BITS)
+
+    def test_round_trip_through_signed_storage(self):
+        fingerprint = simhash(self.TEXT)
+        for value in (fingerprint, fingerprint | (1 << (BITS - 1)), (1 << BITS) - 1):
+            stored = to_signed(value)
+            self.assertGreaterEqual(stored, -(1 << (BITS - 1)))
+            self.assertLess(stored, 1 << (BITS - 1))
+            self.assertEqual(to_unsigned(stored), value)
+            self.assertEqual(hamming(value, to_unsigned(stored)), 0)
+            self.assertEqual(hamming(value ^ 0b111, to_unsigned(stored)), 3)
+
+
+class SearchIndexTests(TestCase):
+    def test_updated_article_is_reindexed(self):
+        if not fts_available():
+            self.skipTest("FTS5 index requires SQLite")
+        article = Article.objects.create(
+            url='https://example.com/article1', content_hash='x', headline='Budget session',
+            content='Parliament debated the monsoon forecast', orgs=['Parliament'], checked_at=timezone.now(),
+        )
+        Article.objects.create(
+            url='https://example.com/article2', content_hash='y', headline='Cricket',
+            content='Rain delayed the monsoon match', checked_at=timezone.now(),
+        )
+        article.content = 'Parliament debated the railway budget'
+        article.save()
+
+        self.assertEqual([a.pk for a in search_articles('railway')], [article.pk])
+        self.assertEqual([a.url for a in search_articles('monsoon')], ['https://example.com/article2'])
+        self.assertEqual([a.pk for a in search_articles('parliament')], [article.pk])
@@ -0,0 +1,68 @@
+"""
+A document-term matrix built once per DataFrame and shared by the
+frequent-words chart and the topic model.
+"""
+import numpy as np
+from scipy import sparse
+from sklearn.feature_extraction.text import CountVectorizer
+
+
+def clean_texts(texts):
+    """Lowercases and turns everything but letters into spaces, for a whole Series."""
+    # Replaced by a space, not removed, so words split by punctuation stay apart
+    return texts.fillna('').astype(str).str.lower().str.replace(r'[^a-z]+', ' ', regex=True)
+
+
+class TextFeatures:
+    """A document-term matrix and its vocabulary ({term: column})."""
+
+    def __init__(self, dtm, vocabulary):
+        self.dtm = dtm
+        self.vocabulary = vocabulary
+
+    @classmethod
+    def from_texts(cls, texts, max_features=20000):
+        vectorizer = CountVectorizer(stop_words='english', max_features=max_features, dtype=np.int32)
+        try:
+            dtm = vectorizer.fit_transform(texts)
+        except ValueError:
+            # Every document was empty or only stop words
+            return cls(sparse.csr_matrix((len(texts), 0), dtype=np.int32), {})
+        return cls(dtm.tocsr(), vectorizer.vocabulary_)
+
+    def __len__(self):
+        return self.dtm.shape[0]
+
+    def top_terms(self, n=20):
+        """The `n` most frequent terms as (term, count) pairs, most frequent first."""
+        if not self.vocabulary:
+            return []
+        totals = np.asarray(self.dtm.sum(axis=0)).ravel()
+        terms = np.empty(len(self.vocabulary), dtype=object)
+        for term, column in self.vocabulary.items():
+            terms[column] = term
+        top = np.argsort(-totals, kind='stable')[:n]
+        return [(terms[i], int(totals[i])) for i in top if totals[i] > 0]
+
+    def project(self, vocabulary):
+        """Returns the matrix re-indexed onto another vocabulary ({term: column})."""
+        rows, cols = [], []
+        for term, column in vocabulary.items():
+            own = self.vocabulary.get(term)
+            if own is not None:
+                rows.append(own)
+                cols.append(column)
+        mapping = sparse.csr_matrix(
+            (np.ones(len(rows), dtype=self.dtm.dtype), (rows, cols)),
+            shape=(len(self.vocabulary), len(vocabulary)),
+        )
+        return (self.dtm @ mapping).tocsr()
+
+
+def text_features(df, max_features=20000):
+    """
+    Returns the TextFeatures of `df` (headline and content). Callers pass the
+    result on rather than storing it on the frame: pandas deep-copies
+    `df.attrs` on every derived frame.
+    """
+    return TextFeatures.from_texts(clean_texts(df['headline'] + " " + df['content']), max_features)
@@ -0,0 +1,94 @@
+"""
+Persistent topic model: the vocabulary is fixed when the model is first built
+and the LDA model is then only updated online with articles it has not seen,
+so topic IDs stay comparable between dashboards.
+"""
+import os
+import pickle
+import tempfile
+import threading
+
+from sklearn.decomposition import LatentDirichletAllocation
+from sklearn.feature_extraction.text import CountVectorizer
+
+
+class TopicModel:
+    """A fixed-vocabulary CountVectorizer plus an online LDA model."""
+
+    def __init__(self, vectorizer, lda, seen=None):
+        self.vectorizer = vectorizer
+        self.lda = lda
+        # Keys (content hashes) of the documents already used for training
+        self.seen = set(seen or ())
+        self._lock = threading.Lock()
+
+    @property
+    def n_topics(self):
+        return self.lda.n_components
+
+    @classmethod
+    def build(cls, texts, keys, n_topics=5, max_features=5000):
+        """Builds the vocabulary from `texts` and fits the LDA model on them."""
+        vectorizer = CountVectorizer(max_df=0.95, min_df=1, stop_words='english', max_features=max_features)
+        dtm = vectorizer.fit_transform(texts)
+        # total_samples is the corpus size online updates are weighted against
+        lda = LatentDirichletAllocation(
+            n_components=n_topics, learning_method='online', total_samples=dtm.shape[0], random_state=42,
+        )
+        lda.fit(dtm)
+        return cls(vectorizer, lda, seen=keys)
+
+    @property
+    def vocabulary(self):
+        return self.vectorizer.vocabulary_
+
+    def update(self, dtm, keys):
+        """
+        Runs one online LDA step on the rows of `dtm` (a document-term matrix
+        over `vocabulary`) whose key has not been seen yet. Returns the number
+        of documents trained on.
+        """
+        with self._lock:
+            rows = [i for i, key in enumerate(keys) if key not in self.seen]
+            if not rows:
+                return 0
+            new = dtm[rows]
+            if new.nnz:
+                # Weigh the step by the corpus the model has seen, not sklearn's 1e6 default
+                self.lda.total_samples = len(self.seen) + len(rows)
+                self.lda.partial_fit(new)
+            self.seen.update(keys[i] for i in rows)
+            return len(rows)
+
+    def transform(self, dtm):
+        """Returns the 1-based topic ID of every row of `dtm`."""
+        return self.lda.transform(dtm).argmax(axis=1) + 1
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        del state['_lock']
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+
+    def save(self, path):
+        path = str(path)
+        directory = os.path.dirname(path) or '.'
+        os.makedirs(directory, exist_ok=True)
+        with self._lock:
+            data = pickle.dumps(self, protocol=pickle.HIGHEST_PROTOCOL)
+        fd, tmp = tempfile.mkstemp(dir=directory, suffix='.tmp')
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path):
+        try:
+            with open(str(path), 'rb') as f:
+                model = pickle.load(f)
+        except (OSError, pickle.UnpicklingError, EOFError, AttributeError):
+            return None
+        return model if isinstance(model, cls) else None
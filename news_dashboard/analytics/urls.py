@@ -1,7 +1,13 @@
-from django.urls import path
+from django.urls import path, re_path
 from . import views
 
 urlpatterns = [
     path('', views.home, name='home'),
     path('dashboard/', views.dashboard, name='dashboard'),
+    path('dashboard/live/', views.dashboard_live, name='dashboard_live'),
+    path('dashboard/live/events/', views.dashboard_stream, name='dashboard_stream'),
+    path('search/', views.search, name='search'),
+    path('jobs/<uuid:job_id>/', views.job_detail, name='job_detail'),
+    path('jobs/<uuid:job_id>/status/', views.job_status, name='job_status'),
+    re_path(r'^charts/(?P<key>[0-9a-f]{64})\.(?P<fmt>png|svg)$', views.chart, name='chart'),
 ]
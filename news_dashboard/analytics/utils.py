@@ -1,117 +1,26 @@
 
 import time
-import base64
-import io
 import pandas as pd
-import matplotlib.pyplot as plt
-import seaborn as sns
-import spacy
-import re
-from datetime import datetime
-from bs4 import BeautifulSoup
-from selenium import webdriver
-from selenium.webdriver.chrome.options import Options
-from textblob import TextBlob
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from django.conf import settings
 from collections import Counter
-from sklearn.feature_extraction.text import CountVectorizer
-from sklearn.decomposition import LatentDirichletAllocation
-
-# Set Matplotlib backend to Agg for web server usage
-plt.switch_backend('Agg')
-sns.set_theme(style="whitegrid")
-
-# Load Spacy Model (Lazy loading or global)
-try:
-    nlp = spacy.load("en_core_web_sm")
-except:
-    from spacy.cli import download
-    download("en_core_web_sm")
-    nlp = spacy.load("en_core_web_sm")
-
-def get_driver():
-    options = Options()
-    options.add_argument('--headless')
-    options.add_argument('--disable-gpu')
-    options.add_argument('--no-sandbox')
-    # Suppress logging
-    options.add_argument('log-level=3') 
-    driver = webdriver.Chrome(options=options)
-    return driver
-
-def get_soup(driver, url):
-    try:
-        driver.get(url)
-        time.sleep(2) # reduced wait for speed
-        return BeautifulSoup(driver.page_source, 'html.parser')
-    except Exception as e:
-        print(f"Error fetching {url}: {e}")
-        return None
-
-def chunk_text(text, chunk_size=500, overlap=50):
-    if not text:
-        return []
-    chunks = []
-    start = 0
-    text_len = len(text)
-    
-    while start < text_len:
-        end = min(start + chunk_size, text_len)
-        chunks.append(text[start:end])
-        if end == text_len:
-            break
-        start += (chunk_size - overlap)
-    return chunks
-
-def analyze_sentiment_with_chunks(text):
-    if not text:
-        return 0.0, 'Neutral'
-    
-    chunks = chunk_text(text)
-    if not chunks:
-        return 0.0, 'Neutral'
-        
-    chunk_polarities = []
-    for chunk in chunks:
-        blob = TextBlob(chunk)
-        chunk_polarities.append(blob.sentiment.polarity)
-    
-    avg_polarity = sum(chunk_polarities) / len(chunk_polarities)
-    
-    if avg_polarity > 0.05:
-        return avg_polarity, 'Positive'
-    elif avg_polarity < -0.05:
-        return avg_polarity, 'Negative'
-    else:
-        return avg_polarity, 'Neutral'
-
-def map_category(row):
-    url = str(row['url']).lower()
-    content = str(row['content']).lower()
-    headline = str(row['headline']).lower()
-    
-    # Priority Mapping
-    if 'sport' in url or 'cricket' in url or 'football' in url:
-        return 'Sports'
-    elif 'business' in url or 'economy' in url or 'market' in url:
-        return 'Business'
-    elif 'tech' in url or 'technology' in url or 'science' in url:
-        return 'Tech'
-    elif 'entertainment' in url or 'movie' in url or 'film' in url:
-        return 'Entertainment'
-    elif 'politics' in url or 'election' in url or 'government' in url:
-        return 'Politics'
-    
-    # Content Fallback
-    if 'politics' in content or 'election' in content: return 'Politics'
-    if 'sport' in content or 'match' in content: return 'Sports'
-    if 'business' in content or 'stock' in content: return 'Business'
-    if 'movie' in content or 'cinema' in content: return 'Entertainment'
-    if 'technology' in content or 'software' in content: return 'Tech'
-    
-    return 'General' # Changed from 'Other' to ensure we have a category
+from django.urls import reverse
+from .categories import CategoryClassifier, DEFAULT_CATEGORY, DEFAULT_RULES
+from .charts import ChartCache, data_uri, render_charts
+from .crawler import Crawler, DomainLimiter, RobotsCache
+from .dedup import SimHashIndex, simhash
+from .driver_pool import get_pool
+from .extraction import DEFAULT_PROFILES_PATH, ProfileRegistry
+from .fetchers import make_fetcher, get_soup
+from .http_cache import ResponseCache
+from . import store
+from .nlp import get_nlp
+from .sentiment import score_texts
+from .text_features import clean_texts, text_features
+from .topics import TopicModel
 
-def extract_entities(text):
-    doc = nlp(text)
+def entities_from_doc(doc):
     people = []
     orgs = []
     locs = []
@@ -127,246 +36,543 @@ def extract_entities(text):
                 locs.append(clean_text)
     return people, orgs, locs
 
-def clean_text_for_topic(text):
-    text = str(text).lower()
-    text = re.sub(r'\s+', ' ', text)
-    text = re.sub(r'[^a-zA-Z\s]', '', text)
-    return text
+def extract_entities(text):
+    return entities_from_doc(get_nlp()(text))
+
+def ner_disabled_pipes(nlp):
+    """
+    Pipeline components NER does not need. A shared tok2vec/transformer is kept
+    only when the NER component listens to it.
+    """
+    keep = {'ner'}
+    for name in ('tok2vec', 'transformer'):
+        if name in nlp.pipe_names:
+            listeners = getattr(nlp.get_pipe(name), 'listening_components', [])
+            if 'ner' in listeners:
+                keep.add(name)
+    return [name for name in nlp.pipe_names if name not in keep]
+
+def extract_entities_batch(texts, batch_size=None, n_process=None):
+    """
+    Streams `texts` through `nlp.pipe` with only the NER components enabled.
+    Returns three lists (people, orgs, locations) aligned with `texts`.
+    """
+    if batch_size is None:
+        batch_size = getattr(settings, 'NEWS_NER_BATCH_SIZE', 32)
+    if n_process is None:
+        n_process = getattr(settings, 'NEWS_NER_PROCESSES', 1)
+    texts = [str(t) for t in texts]
+    if not texts:
+        return [], [], []
+    nlp = get_nlp()
+    docs = nlp.pipe(texts, batch_size=batch_size, n_process=n_process, disable=ner_disabled_pipes(nlp))
+    people, orgs, locs = zip(*(entities_from_doc(doc) for doc in docs))
+    return list(people), list(orgs), list(locs)
+
+_category_classifier = None
+_category_classifier_lock = threading.Lock()
+
+def get_category_classifier():
+    global _category_classifier
+    with _category_classifier_lock:
+        if _category_classifier is None:
+            _category_classifier = CategoryClassifier(
+                getattr(settings, 'NEWS_CATEGORY_RULES', None) or DEFAULT_RULES,
+                default=getattr(settings, 'NEWS_DEFAULT_CATEGORY', DEFAULT_CATEGORY),
+            )
+        return _category_classifier
+
+_response_cache = None
+_response_cache_lock = threading.Lock()
+
+def get_response_cache():
+    global _response_cache
+    cache_dir = getattr(settings, 'NEWS_HTTP_CACHE_DIR', None)
+    if not cache_dir:
+        return None
+    with _response_cache_lock:
+        if _response_cache is None:
+            _response_cache = ResponseCache(
+                cache_dir,
+                ttl=getattr(settings, 'NEWS_HTTP_CACHE_TTL', 24 * 3600),
+                max_bytes=getattr(settings, 'NEWS_HTTP_CACHE_MAX_BYTES', 200 * 1024 * 1024),
+            )
+        return _response_cache
+
+_profiles = None
+_profiles_lock = threading.Lock()
 
-def scrape_and_process(base_url):
-    driver = get_driver()
-    articles_data = []
+def get_profiles():
+    """The extraction profile registry, loaded and compiled once per process."""
+    global _profiles
+    with _profiles_lock:
+        if _profiles is None:
+            _profiles = ProfileRegistry.from_file(getattr(settings, 'NEWS_EXTRACTION_PROFILES', DEFAULT_PROFILES_PATH))
+        return _profiles
+
+_robots = None
+_domain_limiter = None
+_crawl_lock = threading.Lock()
+
+def get_robots():
+    global _robots
+    if not getattr(settings, 'NEWS_CRAWL_RESPECT_ROBOTS', True):
+        return None
+    with _crawl_lock:
+        if _robots is None:
+            _robots = RobotsCache()
+        return _robots
+
+def get_domain_limiter():
+    """The per-host politeness limits shared by every fetcher in the process."""
+    global _domain_limiter
+    robots = get_robots()
+    with _crawl_lock:
+        if _domain_limiter is None:
+            _domain_limiter = DomainLimiter(
+                delay=getattr(settings, 'NEWS_CRAWL_DOMAIN_DELAY', 0.25),
+                connections=getattr(settings, 'NEWS_CRAWL_DOMAIN_CONNECTIONS', 4),
+                robots=robots,
+            )
+        return _domain_limiter
+
+def get_driver_pool():
+    return get_pool(
+        size=getattr(settings, 'NEWS_DRIVER_POOL_SIZE', 2),
+        max_pages=getattr(settings, 'NEWS_DRIVER_MAX_PAGES', 100),
+    )
+
+def new_fetcher():
+    return make_fetcher(
+        getattr(settings, 'NEWS_FETCH_BACKEND', 'http'),
+        page_timeout=getattr(settings, 'NEWS_PAGE_TIMEOUT', 10),
+        site_timeouts=getattr(settings, 'NEWS_SITE_TIMEOUTS', None),
+        pool=get_driver_pool(),
+        cache=get_response_cache(),
+        limiter=get_domain_limiter(),
+    )
+
+def iter_fetch_articles(links, workers=None):
+    """
+    Fetches and parses article pages with a bounded pool of workers and yields
+    `(index, article)` pairs as pages complete (`article` is None on failure).
+    Every worker thread owns its own fetcher; articles carry the per-URL fetch
+    time in `fetch_seconds` and the time the page took to become ready in
+    `ready_seconds`.
+    """
+    if workers is None:
+        workers = getattr(settings, 'NEWS_FETCH_WORKERS', 4)
+    workers = max(1, min(workers, len(links) or 1))
+
+    profiles = get_profiles()
+    local = threading.local()
+    fetchers = []
+    fetchers_lock = threading.Lock()
+
+    def worker_fetcher():
+        fetcher = getattr(local, 'fetcher', None)
+        if fetcher is None:
+            fetcher = new_fetcher()
+            local.fetcher = fetcher
+            with fetchers_lock:
+                fetchers.append(fetcher)
+        return fetcher
+
+    def fetch_one(link):
+        started = time.perf_counter()
+        try:
+            fetcher = worker_fetcher()
+            profile = profiles.for_url(link)
+            art_soup = get_soup(fetcher, link, required=profile.ready, keep=profile.keep)
+            if not art_soup:
+                return None
+            article = profile.extract(link, art_soup)
+            article['ready_seconds'] = fetcher.last_ready_seconds
+            article['fetch_seconds'] = round(time.perf_counter() - started, 3)
+            return article
+        except Exception as e:
+            print(f"Skipping {link}: {e}")
+            return None
+
+    started = time.perf_counter()
+    fetched = 0
+    busy = 0.0
+    stripped = 0
+    executor = ThreadPoolExecutor(max_workers=workers)
     try:
-        soup = get_soup(driver, base_url)
-        links = []
-        seen_urls = set()
-        
-        if soup:
-            # Gather links similar to the notebook
-            for tag in soup.select('h3.title a, h2.title a, div.story-card a'):
-                href = tag.get('href')
-                if href and href not in seen_urls and 'http' in href and '/article' in href:
-                    links.append(href)
-                    seen_urls.add(href)
-        
-        # Limit to 15 articles as per requirement
-        links = links[:50]
-        
-        for link in links:
-            try:
-                art_soup = get_soup(driver, link)
-                if not art_soup: continue
-                
-                title_tag = art_soup.select_one('h1.title')
-                title = title_tag.get_text(strip=True) if title_tag else "N/A"
-                
-                # Basic Category
-                parts = link.split('/')
-                category = "General"
-                # (Simplified extraction, map_category will do better job)
-                
-                # Date
-                pub_date = str(datetime.now().date())
-                meta_date = art_soup.find('meta', property='article:published_time')
-                if meta_date:
-                    pub_date = meta_date.get('content', pub_date)
-
-                # Content
-                body_div = art_soup.select_one('div[id^="content-body-"]')
-                content = body_div.get_text(strip=True) if body_div else ""
-                if not content:
-                     paras = art_soup.select('div.article-body p')
-                     content = " ".join([p.get_text(strip=True) for p in paras])
-                
-                articles_data.append({
-                    'url': link,
-                    'headline': title,
-                    'category': category,
-                    'date': pub_date,
-                    'content': content
-                })
-            except Exception as e:
-                print(f"Skipping {link}: {e}")
-                
+        futures = {executor.submit(fetch_one, link): i for i, link in enumerate(links)}
+        for future in as_completed(futures):
+            article = future.result()
+            if article:
+                fetched += 1
+                busy += article['fetch_seconds']
+                stripped += article['boilerplate_bytes']
+            yield futures[future], article
     finally:
-        driver.quit()
-        
-    df = pd.DataFrame(articles_data)
+        executor.shutdown(wait=True, cancel_futures=True)
+        for fetcher in fetchers:
+            try:
+                fetcher.close()
+            except Exception:
+                pass
+
+    elapsed = time.perf_counter() - started
+    print(f"Fetched {fetched}/{len(links)} articles in {elapsed:.1f}s "
+          f"with {workers} worker(s) (sum of per-URL times {busy:.1f}s), "
+          f"{stripped / 1024:.1f} KB of boilerplate removed")
+
+def discover_links(seeds, limit=None):
+    """
+    Crawls `seeds` (one URL, or several separated by whitespace or commas) and
+    returns the article links found, at most `limit` of them.
+    """
+    profiles = get_profiles()
+    crawler = Crawler(
+        new_fetcher,
+        robots=get_robots(),
+        max_depth=getattr(settings, 'NEWS_CRAWL_MAX_DEPTH', 0),
+        max_articles=limit or getattr(settings, 'NEWS_CRAWL_MAX_ARTICLES', 200),
+        max_articles_per_site=getattr(settings, 'NEWS_CRAWL_MAX_ARTICLES_PER_SITE', 50),
+        max_pages_per_site=getattr(settings, 'NEWS_CRAWL_MAX_PAGES_PER_SITE', 20),
+        workers=getattr(settings, 'NEWS_CRAWL_WORKERS', 8),
+        link_selector=getattr(settings, 'NEWS_CRAWL_LINK_SELECTOR', 'a[href]'),
+        ready_selectors=profiles.index_ready(),
+        article_patterns=profiles.article_patterns(),
+        article_pattern=profiles.default.article_pattern,
+    )
+    return crawler.crawl(seeds)
+
+def process_fetched(articles, stored):
+    """
+    Analyses freshly fetched articles. Pages whose content hash matches the
+    stored copy reuse the stored analysis, and so do copies of a story already
+    stored under another URL (same content hash or a near-identical SimHash),
+    which are recorded as duplicates of it. The rest go through NLP and are saved.
+    Returns (frame, number of articles analysed, number of duplicates).
+    """
+    new_articles = []
+    unchanged = []
+    originals = []
+    batch_hashes = set()
+    batch_index = SimHashIndex()
+    # Kept out of the frame: pandas would turn a column with missing values
+    # into float64, which cannot hold a 64-bit fingerprint exactly
+    fingerprints = {}
+    duplicates = 0
+    for article in articles:
+        article['content_hash'] = store.content_hash(article['headline'], article['content'])
+        previous = stored.get(article['url'])
+        if previous is not None and previous.content_hash == article['content_hash']:
+            unchanged.append(previous)
+            continue
+        fingerprint = simhash(article['content'])
+        # Copies within this batch: the first one is analysed below
+        if article['content_hash'] in batch_hashes or batch_index.near(fingerprint) is not None:
+            duplicates += 1
+            continue
+        original = store.find_duplicate(article['url'], article['content_hash'], fingerprint)
+        if original is not None:
+            store.save_duplicate(article, original, fingerprint)
+            originals.append(original)
+            duplicates += 1
+            continue
+        batch_hashes.add(article['content_hash'])
+        batch_index.add(article['url'], fingerprint)
+        fingerprints[article['url']] = fingerprint
+        new_articles.append(article)
+    if unchanged:
+        store.mark_checked(unchanged)
+
+    df_new = analyze_articles(pd.DataFrame(new_articles))
+    if not df_new.empty:
+        store.save_articles(df_new, fingerprints)
+    reused = [store.canonical(a) for a in unchanged] + originals
+    return pd.concat([store.rows_frame(reused), df_new], ignore_index=True), len(new_articles), duplicates
+
+def iter_process_links(links, workers=None, batch_size=None, progress=None):
+    """
+    Yields analysed DataFrame batches for `links` as they become available:
+    stored articles first, then every `batch_size` fetched pages (all of them at
+    once when `batch_size` is None). `progress`, if given, is called with
+    keyword counts (total, fetched, analysed) as the pipeline advances.
+    """
+    # Articles checked recently are reused as-is; the rest are fetched and only
+    # re-analysed when their content changed since they were stored.
+    stored = store.stored_articles(links)
+    refresh = getattr(settings, 'NEWS_ARTICLE_REFRESH_SECONDS', 6 * 3600)
+    reused = [stored[link] for link in links if link in stored and store.is_recent(stored[link], refresh)]
+    reused_urls = {a.url for a in reused}
+    to_fetch = [link for link in links if link not in reused_urls]
+
+    fetched = len(reused)
+    analysed = 0
+    new_count = 0
+    duplicates = 0
+    # Several URLs can resolve to one stored story: emit each story once
+    emitted = set()
+
+    def unseen(frame):
+        if frame.empty:
+            return frame
+        frame = frame[~frame['url'].isin(emitted)].drop_duplicates('url')
+        emitted.update(frame['url'])
+        return frame.reset_index(drop=True)
+
+    if progress:
+        progress(total=len(links), fetched=fetched)
+    if reused:
+        analysed += len(reused)
+        if progress:
+            progress(analysed=analysed)
+        yield unseen(store.rows_frame([store.canonical(a) for a in reused]))
+
+    pending = []
+    for _, article in iter_fetch_articles(to_fetch, workers):
+        fetched += 1
+        if progress:
+            progress(fetched=fetched)
+        if article:
+            pending.append(article)
+        if batch_size and len(pending) >= batch_size:
+            frame, n_new, n_dup = process_fetched(pending, stored)
+            analysed += len(pending)
+            pending = []
+            new_count += n_new
+            duplicates += n_dup
+            if progress:
+                progress(analysed=analysed)
+            yield unseen(frame)
+    if pending:
+        frame, n_new, n_dup = process_fetched(pending, stored)
+        analysed += len(pending)
+        new_count += n_new
+        duplicates += n_dup
+        if progress:
+            progress(analysed=analysed)
+        yield unseen(frame)
+    print(f"{new_count} new or changed article(s), {duplicates} duplicate(s) of known stories, "
+          f"{analysed - new_count - duplicates} reused from the store")
+
+def scrape_and_process(base_url, workers=None, progress=None):
+    """
+    Scrapes the articles linked from `base_url` (one or more seed URLs, see
+    discover_links) and analyses the new ones.
+    `progress`, if given, is called with keyword counts (total, fetched,
+    analysed) as the pipeline advances.
+    """
+    links = discover_links(base_url)
+    frames = [f for f in iter_process_links(links, workers=workers, progress=progress) if not f.empty]
+    if not frames:
+        return pd.DataFrame()
+    df = pd.concat(frames, ignore_index=True)
+    # Keep the order of the links on the page
+    order = {link: i for i, link in enumerate(links)}
+    df = df.sort_values('url', key=lambda s: s.map(order)).reset_index(drop=True)
+    return df
+
+def analyze_articles(df):
+    """Runs sentiment, category mapping and NER on freshly scraped articles."""
     if df.empty:
         return df
 
-    # Sentiment
-    df[['sentiment_score', 'sentiment_label']] = df['content'].apply(
-        lambda x: pd.Series(analyze_sentiment_with_chunks(x))
+    # Sentiment (all chunks of all articles in one pass)
+    scores, labels = score_texts(
+        df['content'],
+        engine=getattr(settings, 'NEWS_SENTIMENT_ENGINE', 'lexicon'),
+        snap=getattr(settings, 'NEWS_CHUNK_SNAP', None),
     )
+    df['sentiment_score'] = scores
+    df['sentiment_label'] = labels
     
     # Categories
-    df['Mapped_Category'] = df.apply(map_category, axis=1)
+    df['Mapped_Category'] = get_category_classifier().classify(df)
     
     # NER
     df['full_text'] = df['headline'] + ". " + df['content']
-    df['People'], df['Orgs'], df['Locations'] = zip(*df['full_text'].apply(extract_entities))
+    df['People'], df['Orgs'], df['Locations'] = extract_entities_batch(df['full_text'])
     
     return df
 
-def generate_plots(df):
-    plots = {}
-    
+def build_chart_specs(df):
+    """
+    Computes the aggregate behind every dashboard chart and returns them as
+    chart specs ({name: spec}, see charts.py) together with `df`, which gains
+    a `Topic` column when topic modeling runs.
+    """
+    specs = {}
+
     # 1. Category Distribution
-    plt.figure(figsize=(10, 6))
     cat_counts = df['Mapped_Category'].value_counts()
-    sns.barplot(x=cat_counts.index, y=cat_counts.values, palette='viridis')
-    plt.title("Articles by Category")
-    plt.xlabel("Category")
-    plt.ylabel("Count")
-    plt.xticks(rotation=45)
-    
-    buf = io.BytesIO()
-    plt.savefig(buf, format='png', bbox_inches='tight')
-    buf.seek(0)
-    plots['category_dist'] = base64.b64encode(buf.getvalue()).decode('utf-8')
-    plt.close()
-    
+    specs['category_dist'] = {
+        'kind': 'bar', 'title': "Articles by Category", 'figsize': [10, 6], 'tight': True,
+        'labels': [str(c) for c in cat_counts.index], 'values': [int(v) for v in cat_counts.values],
+        'palette': 'viridis', 'rotation': 45, 'xlabel': "Category", 'ylabel': "Count",
+    }
+
     # 2. Sentiment by Category (Stacked)
-    plt.figure(figsize=(10, 6))
     sentiment_counts = df.groupby(['Mapped_Category', 'sentiment_label']).size().unstack(fill_value=0)
-    sentiment_counts.plot(kind='bar', stacked=True, figsize=(10, 6), colormap='viridis')
-    plt.title("Sentiment Distribution by Category")
-    plt.xlabel("Category")
-    plt.ylabel("Count")
-    plt.xticks(rotation=45)
-    plt.tight_layout()
-    
-    buf = io.BytesIO()
-    plt.savefig(buf, format='png', bbox_inches='tight')
-    buf.seek(0)
-    plots['sentiment_cat'] = base64.b64encode(buf.getvalue()).decode('utf-8')
-    plt.close() 
-    
+    specs['sentiment_cat'] = {
+        'kind': 'stacked_bar', 'title': "Sentiment Distribution by Category", 'figsize': [10, 6], 'tight': True,
+        'index': [str(i) for i in sentiment_counts.index], 'columns': [str(c) for c in sentiment_counts.columns],
+        'values': sentiment_counts.values.astype(int).tolist(), 'xlabel': "Category", 'ylabel': "Count",
+    }
+
     # 3. Top NER Entities (People, Orgs, Locs)
     all_people = [p for sub in df['People'] for p in sub]
     all_orgs = [o for sub in df['Orgs'] for o in sub]
     all_locs = [l for sub in df['Locations'] for l in sub]
-    
-    # Helper to plot top 10
-    def plot_top10(data, title):
-        if not data: return None
-        plt.figure(figsize=(10, 6))
+
+    def top10(data, title):
         counts = Counter(data).most_common(10)
         labels, values = zip(*counts)
-        sns.barplot(x=list(values), y=list(labels), palette='magma')
-        plt.title(title)
-        plt.xlabel("Count")
-        plt.tight_layout()
-        
-        buf = io.BytesIO()
-        plt.savefig(buf, format='png', bbox_inches='tight')
-        buf.seek(0)
-        b64 = base64.b64encode(buf.getvalue()).decode('utf-8')
-        plt.close()
-        return b64
-
-    plots['top_people'] = plot_top10(all_people, "Top 10 People Mentioned")
-    plots['top_orgs'] = plot_top10(all_orgs, "Top 10 Organizations Mentioned")
-    plots['top_locs'] = plot_top10(all_locs, "Top 10 Locations Mentioned")
+        return {
+            'kind': 'hbar', 'title': title, 'figsize': [10, 6], 'tight': True,
+            'labels': list(labels), 'values': [int(v) for v in values], 'palette': 'magma', 'xlabel': "Count",
+        }
+
+    if all_people:
+        specs['top_people'] = top10(all_people, "Top 10 People Mentioned")
+    if all_orgs:
+        specs['top_orgs'] = top10(all_orgs, "Top 10 Organizations Mentioned")
+    if all_locs:
+        specs['top_locs'] = top10(all_locs, "Top 10 Locations Mentioned")
 
     # --- ADVANCED / NEW PLOTS ---
 
-    # 4. Top 20 Frequent Words
-    try:
-        text_data = df['headline'] + " " + df['content']
-        cv = CountVectorizer(stop_words='english', max_features=20)
-        word_counts = cv.fit_transform(text_data)
-        sum_words = word_counts.sum(axis=0)
-        words_freq = [(word, sum_words[0, idx]) for word, idx in cv.vocabulary_.items()]
-        words_freq = sorted(words_freq, key=lambda x: x[1], reverse=True)
-        
-        if words_freq:
-            words, counts = zip(*words_freq)
-            plt.figure(figsize=(12, 6))
-            sns.barplot(x=list(words), y=list(counts), palette='GnBu_r')
-            plt.title("Top 20 Frequent Words")
-            plt.xticks(rotation=45, ha='right')
-            plt.ylabel("Frequency")
-            plt.tight_layout()
-            
-            buf = io.BytesIO()
-            plt.savefig(buf, format='png')
-            buf.seek(0)
-            plots['word_freq'] = base64.b64encode(buf.getvalue()).decode('utf-8')
-            plt.close()
-    except Exception as e:
-        print(f"Word Freq Error: {e}")
+    # 4. Top 20 Frequent Words (from the document-term matrix shared with the topic model)
+    features = text_features(df)
+    words_freq = features.top_terms(20)
+    if words_freq:
+        words, counts = zip(*words_freq)
+        specs['word_freq'] = {
+            'kind': 'bar', 'title': "Top 20 Frequent Words", 'figsize': [12, 6],
+            'labels': list(words), 'values': [int(c) for c in counts],
+            'palette': 'GnBu_r', 'rotation': 45, 'ha': 'right', 'ylabel': "Frequency",
+        }
 
     # 5. Overall Sentiment Pie Chart
-    try:
-        plt.figure(figsize=(6, 6))
-        sent_counts = df['sentiment_label'].value_counts()
-        if not sent_counts.empty:
-            plt.pie(sent_counts, labels=sent_counts.index, autopct='%1.1f%%', startangle=140, colors=sns.color_palette('pastel'))
-            plt.title("Overall Sentiment Distribution")
-            plt.tight_layout()
-            
-            buf = io.BytesIO()
-            plt.savefig(buf, format='png')
-            buf.seek(0)
-            plots['sentiment_pie'] = base64.b64encode(buf.getvalue()).decode('utf-8')
-            plt.close()
-    except Exception as e:
-        print(f"Pie Chart Error: {e}")
+    sent_counts = df['sentiment_label'].value_counts()
+    if not sent_counts.empty:
+        specs['sentiment_pie'] = {
+            'kind': 'pie', 'title': "Overall Sentiment Distribution", 'figsize': [6, 6],
+            'labels': [str(l) for l in sent_counts.index], 'values': [int(v) for v in sent_counts.values],
+        }
 
     # 6. Sentiment Heatmap
-    try:
-        plt.figure(figsize=(8, 6))
-        heatmap_data = df.groupby(['Mapped_Category', 'sentiment_label']).size().unstack(fill_value=0)
-        if not heatmap_data.empty:
-            sns.heatmap(heatmap_data, annot=True, fmt='d', cmap='YlGnBu')
-            plt.title("Sentiment Count per Category")
-            plt.ylabel("Category")
-            plt.xlabel("Sentiment")
-            plt.tight_layout()
-            
-            buf = io.BytesIO()
-            plt.savefig(buf, format='png')
-            buf.seek(0)
-            plots['sentiment_heatmap'] = base64.b64encode(buf.getvalue()).decode('utf-8')
-            plt.close()
-    except Exception as e:
-        print(f"Heatmap Error: {e}")
+    if not sentiment_counts.empty:
+        specs['sentiment_heatmap'] = {
+            'kind': 'heatmap', 'title': "Sentiment Count per Category", 'figsize': [8, 6],
+            'index': [str(i) for i in sentiment_counts.index], 'columns': [str(c) for c in sentiment_counts.columns],
+            'values': sentiment_counts.values.astype(int).tolist(), 'xlabel': "Sentiment", 'ylabel': "Category",
+        }
 
     # 7. Topic Modeling
     try:
-        df['cleaned_topic_text'] = df['content'].apply(clean_text_for_topic)
-        # Handle small datasets
-        n_topics = 5 if len(df) >= 7 else min(len(df), 3) 
-        
-        # Need at least a few articles and words
-        if len(df) > 2:
-            vectorizer = CountVectorizer(max_df=0.95, min_df=1, stop_words='english')
-            dtm = vectorizer.fit_transform(df['cleaned_topic_text'])
-            
-            lda = LatentDirichletAllocation(n_components=n_topics, random_state=42)
-            lda.fit(dtm)
-            
-            # Assign Topics
-            topic_results = lda.transform(dtm)
-            df['Topic'] = topic_results.argmax(axis=1) + 1
-            
-            # Plot
-            plt.figure(figsize=(8, 5))
+        topics = assign_topics(df, features)
+        if topics is not None:
+            df['Topic'] = topics
             topic_counts = df['Topic'].value_counts().sort_index()
-            sns.barplot(x=topic_counts.index, y=topic_counts.values, palette='viridis')
-            plt.title("Number of Articles per Topic")
-            plt.xlabel("Topic ID")
-            plt.ylabel("Count")
-            plt.tight_layout()
-            
-            buf = io.BytesIO()
-            plt.savefig(buf, format='png')
-            buf.seek(0)
-            plots['topic_dist'] = base64.b64encode(buf.getvalue()).decode('utf-8')
-            plt.close()
+            specs['topic_dist'] = {
+                'kind': 'bar', 'title': "Number of Articles per Topic", 'figsize': [8, 5],
+                'labels': [int(t) for t in topic_counts.index], 'values': [int(v) for v in topic_counts.values],
+                'palette': 'viridis', 'xlabel': "Topic ID", 'ylabel': "Count",
+            }
     except Exception as e:
         print(f"LDA Error: {e}")
-    
+
+    return specs, df
+
+_topic_model = None
+_topic_model_lock = threading.Lock()
+
+def assign_topics(df, features):
+    """
+    Returns the topic ID of every article in `df` from the persistent topic
+    model, after training it on the articles it has not seen yet. `features`
+    is the shared document-term matrix of `df` (see text_features.py). The
+    model is built from the stored corpus on first use; returns None while
+    there are too few articles to build it.
+    """
+    global _topic_model
+    path = getattr(settings, 'NEWS_TOPIC_MODEL_PATH', None)
+    keys = [store.content_hash(h, c) for h, c in zip(df['headline'], df['content'])]
+
+    with _topic_model_lock:
+        if _topic_model is None and path:
+            _topic_model = TopicModel.load(path)
+        if _topic_model is None:
+            corpus = pd.concat([df[['headline', 'content']], pd.DataFrame(store.corpus(), columns=['headline', 'content'])])
+            corpus['key'] = [store.content_hash(h, c) for h, c in zip(corpus['headline'], corpus['content'])]
+            corpus = corpus.drop_duplicates('key')
+            # Need at least a few articles and words
+            if len(corpus) <= 2:
+                return None
+            _topic_model = TopicModel.build(
+                clean_texts(corpus['headline'] + " " + corpus['content']),
+                list(corpus['key']),
+                n_topics=getattr(settings, 'NEWS_TOPIC_COUNT', 5),
+            )
+            trained = len(corpus)
+        else:
+            trained = _topic_model.update(features.project(_topic_model.vocabulary), keys)
+        model = _topic_model
+
+    if trained and path:
+        model.save(path)
+    return model.transform(features.project(model.vocabulary))
+
+_chart_cache = None
+_chart_cache_lock = threading.Lock()
+
+def get_chart_cache():
+    global _chart_cache
+    cache_dir = getattr(settings, 'NEWS_CHART_CACHE_DIR', None)
+    if not cache_dir:
+        return None
+    with _chart_cache_lock:
+        if _chart_cache is None:
+            _chart_cache = ChartCache(cache_dir)
+        return _chart_cache
+
+def generate_plots(df, progress=None):
+    """
+    Returns ({name: image src}, df). Charts are referenced by their cacheable
+    URL, or inlined as data URIs when the chart cache is disabled.
+    """
+    specs, df = build_chart_specs(df)
+    if getattr(settings, 'NEWS_SVG_BAR_CHARTS', False):
+        for spec in specs.values():
+            if spec['kind'] in ('bar', 'hbar'):
+                spec['format'] = 'svg'
+    cache = get_chart_cache()
+    charts = render_charts(
+        specs,
+        cache=cache,
+        workers=getattr(settings, 'NEWS_PLOT_WORKERS', 0),
+        progress=progress,
+    )
+    plots = {}
+    for name, (key, fmt, data) in charts.items():
+        if cache is not None:
+            plots[name] = reverse('chart', kwargs={'key': key, 'fmt': fmt})
+        else:
+            plots[name] = data_uri(fmt, data)
     return plots, df
+
+def client_charts():
+    return getattr(settings, 'NEWS_CHART_MODE', 'server') == 'client'
+
+def generate_charts(df, progress=None):
+    """
+    Returns (plots, chart_data, df). In 'client' chart mode nothing is drawn on
+    the server: `chart_data` holds the chart specs for the browser to render and
+    `plots` is empty. Otherwise `plots` holds the rendered image sources (see
+    generate_plots) and `chart_data` is None.
+    """
+    if client_charts():
+        chart_data, df = build_chart_specs(df)
+        if progress:
+            progress(plotted=len(chart_data))
+        return {}, chart_data, df
+    plots, df = generate_plots(df, progress=progress)
+    return plots, None, df
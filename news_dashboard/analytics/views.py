@@ -1,5 +1,16 @@
-from django.shortcuts import render
-from .utils import scrape_and_process, generate_plots
+import time
+
+from django.conf import settings
+from django.http import FileResponse, Http404, HttpResponseBadRequest, JsonResponse, StreamingHttpResponse
+from django.shortcuts import get_object_or_404, redirect, render
+from django.utils.dateparse import parse_date
+from django.views.decorators.http import condition
+from .charts import CONTENT_TYPES
+from .jobs import build_result, fail_if_stale, submit_job
+from .models import AnalysisJob
+from .search import SENTIMENTS, categories, search_articles
+from .streaming import stream_events
+from .utils import get_chart_cache, scrape_and_process, generate_charts
 
 def home(request):
     return render(request, 'home.html')
@@ -9,6 +20,11 @@ def dashboard(request):
         url = request.POST.get('url')
         if not url:
             return render(request, 'home.html', {'error': 'Please enter a URL'})
+
+        # Run the analysis in the background and let the browser poll for it
+        if getattr(settings, 'NEWS_ASYNC_JOBS', True):
+            job = submit_job(url)
+            return redirect('job_detail', job_id=job.pk)
         
         # Scrape and Process
         try:
@@ -18,20 +34,85 @@ def dashboard(request):
                 return render(request, 'home.html', {'error': 'No articles found or scraping failed. Try another URL.'})
             
             # Generate Plots
-            plots, df = generate_plots(df)
-            
-            # Convert DF to list of dicts for template
-            articles = df[['headline', 'url', 'sentiment_label', 'sentiment_score', 'Mapped_Category']].to_dict('records')
+            plots, chart_data, df = generate_charts(df)
             
-            context = {
-                'url': url,
-                'articles': articles,
-                'plots': plots,
-                'total_articles': len(df)
-            }
+            context = {'url': url, **build_result(df, plots, chart_data)}
             return render(request, 'dashboard.html', context)
             
         except Exception as e:
             return render(request, 'home.html', {'error': f"An error occurred: {str(e)}"})
             
     return render(request, 'home.html')
+
+def job_detail(request, job_id):
+    job = fail_if_stale(get_object_or_404(AnalysisJob, pk=job_id))
+    if job.status == AnalysisJob.DONE:
+        return render(request, 'dashboard.html', {'url': job.url, **job.result})
+    if job.status == AnalysisJob.FAILED:
+        return render(request, 'home.html', {'error': job.error})
+    return render(request, 'job.html', {'job': job})
+
+def job_status(request, job_id):
+    job = fail_if_stale(get_object_or_404(AnalysisJob, pk=job_id))
+    return JsonResponse({
+        'id': str(job.pk),
+        'status': job.status,
+        'total': job.total,
+        'fetched': job.fetched,
+        'analysed': job.analysed,
+        'plotted': job.plotted,
+        'error': job.error,
+        'finished': job.is_finished,
+    })
+
+def dashboard_live(request):
+    url = request.GET.get('url')
+    if not url:
+        return render(request, 'home.html', {'error': 'Please enter a URL'})
+    return render(request, 'stream.html', {'url': url})
+
+async def dashboard_stream(request):
+    # Server-sent events; serve the project through asgi.py so they are not buffered
+    url = request.GET.get('url')
+    if not url:
+        return HttpResponseBadRequest('Missing url')
+    response = StreamingHttpResponse(stream_events(url), content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'
+    return response
+
+def _date_param(request, name):
+    try:
+        return parse_date(request.GET.get(name) or '')
+    except ValueError:
+        return None
+
+def search(request):
+    query = request.GET.get('q', '')
+    filters = {
+        'category': request.GET.get('category') or None,
+        'sentiment': request.GET.get('sentiment') or None,
+        'date_from': _date_param(request, 'from'),
+        'date_to': _date_param(request, 'to'),
+    }
+    started = time.perf_counter()
+    articles = search_articles(query, **filters)
+    elapsed_ms = (time.perf_counter() - started) * 1000
+    return render(request, 'search.html', {
+        'query': query,
+        'filters': filters,
+        'articles': articles,
+        'elapsed_ms': elapsed_ms,
+        'categories': categories(),
+        'sentiments': SENTIMENTS,
+    })
+
+@condition(etag_func=lambda request, key, fmt: key)
+def chart(request, key, fmt):
+    # Chart images are named by the hash of their input, so they never change
+    cache = get_chart_cache()
+    if cache is None or not cache.exists(key, fmt):
+        raise Http404('Unknown chart')
+    response = FileResponse(open(cache.path(key, fmt), 'rb'), content_type=CONTENT_TYPES[fmt])
+    response['Cache-Control'] = 'public, max-age=31536000, immutable'
+    return response
@@ -79,6 +79,8 @@ DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': BASE_DIR / 'db.sqlite3',
+        # Background jobs write progress from worker threads; wait for locks
+        'OPTIONS': {'timeout': 20},
     }
 }
 
@@ -123,3 +125,106 @@ STATIC_URL = 'static/'
 # https://docs.djangoproject.com/en/5.1/ref/settings/#default-auto-field
 
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
+
+
+# News analytics pipeline
+
+# Number of concurrent workers (each with its own fetcher) used to fetch article pages.
+NEWS_FETCH_WORKERS = 4
+
+# Page fetch backend: 'http' (keep-alive requests, Selenium only as a fallback) or 'selenium'.
+NEWS_FETCH_BACKEND = 'http'
+
+# Longest time (seconds) the browser waits for article selectors before giving up,
+# with optional per-hostname overrides.
+NEWS_PAGE_TIMEOUT = 10
+NEWS_SITE_TIMEOUTS = {
+    'www.thehindu.com': 8,
+}
+
+# Crawling: the dashboard accepts several seed URLs. Section pages on the seed's
+# site are followed NEWS_CRAWL_MAX_DEPTH links deep (0 reads the seed pages only)
+# and links whose path matches the `article_pattern` of the site's extraction
+# profile are collected as articles.
+NEWS_CRAWL_MAX_DEPTH = 0
+NEWS_CRAWL_MAX_ARTICLES = 200
+NEWS_CRAWL_MAX_ARTICLES_PER_SITE = 50
+NEWS_CRAWL_MAX_PAGES_PER_SITE = 20
+NEWS_CRAWL_WORKERS = 8
+NEWS_CRAWL_LINK_SELECTOR = 'a[href]'
+
+# Per-site extraction profiles (selectors for every article field, with fallbacks,
+# the selectors index and article pages need before their HTML is trusted and the
+# pattern of the site's article URLs).
+NEWS_EXTRACTION_PROFILES = BASE_DIR / 'analytics' / 'extraction_profiles.json'
+
+# Per-host politeness for every fetch: minimum seconds between requests (raised to
+# the robots.txt Crawl-delay when that is longer) and concurrent connections.
+NEWS_CRAWL_DOMAIN_DELAY = 0.25
+NEWS_CRAWL_DOMAIN_CONNECTIONS = 4
+NEWS_CRAWL_RESPECT_ROBOTS = True
+
+# Warm headless Chrome instances shared by all dashboard requests; each browser
+# is recycled after NEWS_DRIVER_MAX_PAGES pages. With NEWS_DRIVER_WARMUP the pool
+# starts its browsers when the app starts instead of on the first fallback.
+NEWS_DRIVER_POOL_SIZE = 2
+NEWS_DRIVER_MAX_PAGES = 100
+NEWS_DRIVER_WARMUP = False
+
+# On-disk cache of fetched article HTML (set NEWS_HTTP_CACHE_DIR to None to disable).
+NEWS_HTTP_CACHE_DIR = BASE_DIR / 'cache' / 'http'
+NEWS_HTTP_CACHE_TTL = 24 * 3600
+NEWS_HTTP_CACHE_MAX_BYTES = 200 * 1024 * 1024
+
+# Stored articles checked within this many seconds are reused without refetching.
+NEWS_ARTICLE_REFRESH_SECONDS = 6 * 3600
+
+# spaCy NER batching: texts per nlp.pipe batch and worker processes (1 = in-process).
+NEWS_NER_BATCH_SIZE = 32
+NEWS_NER_PROCESSES = 1
+
+# Load the spaCy model in a background thread when the app starts instead of on first use.
+NEWS_NLP_WARMUP = False
+
+# Sentiment engine: 'lexicon' (vectorised lexicon scoring) or 'textblob' (TextBlob per chunk).
+NEWS_SENTIMENT_ENGINE = 'lexicon'
+
+# Snap sentiment chunk boundaries to 'word' or 'sentence' edges (None cuts anywhere).
+NEWS_CHUNK_SNAP = 'word'
+
+# Category rules as (field, category, keywords) tuples checked in order, where field
+# is 'url' or 'content'; the first match wins. None uses analytics.categories.DEFAULT_RULES.
+NEWS_CATEGORY_RULES = None
+NEWS_DEFAULT_CATEGORY = 'General'
+
+# Run dashboard analyses as background jobs (polled by the browser), how many
+# may run at the same time in one process and after how long an unfinished job
+# is reported as failed (its process may have restarted).
+NEWS_ASYNC_JOBS = True
+NEWS_JOB_WORKERS = 2
+NEWS_JOB_TIMEOUT_SECONDS = 1800
+
+# Live (server-sent events) dashboard: articles analysed per batch, the minimum
+# interval between aggregate refreshes, how many streams may run at the same time
+# in one process (the rest wait) and how many undelivered events a stream buffers.
+NEWS_STREAM_BATCH_SIZE = 5
+NEWS_STREAM_SUMMARY_SECONDS = 2
+NEWS_STREAM_WORKERS = 2
+NEWS_STREAM_QUEUE_SIZE = 50
+
+# Persistent topic model: updated online with new articles instead of refitted per
+# request, so topic IDs stay comparable between dashboards (None keeps it in memory).
+NEWS_TOPIC_MODEL_PATH = BASE_DIR / 'cache' / 'topics.pkl'
+NEWS_TOPIC_COUNT = 5
+
+# Chart rendering: processes used to draw figures (0 renders inline) and the
+# on-disk cache of rendered charts keyed by the hash of their input aggregate.
+NEWS_PLOT_WORKERS = 2
+NEWS_CHART_CACHE_DIR = BASE_DIR / 'cache' / 'charts'
+
+# Render plain bar charts as SVG instead of PNG.
+NEWS_SVG_BAR_CHARTS = False
+
+# Where dashboard charts are drawn: 'server' renders images with matplotlib,
+# 'client' sends the chart aggregates as JSON and draws them in the browser.
+NEWS_CHART_MODE = 'server'